@@ -1,13 +1,18 @@
 # app.py
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import importlib
 import os
+import threading
 import cv2
 import time
-import json
 
 from PIL import Image, ImageTk
-from core import ParkingSecuritySystem
+from clips import ClipRecorder
+from events import remove_log
+from pipeline import FramePipeline
+from review import IndexedVideoWriter, ReviewReader, alert_frames
+from report import build_report, write_report
 
 
 class ParkingSecurityApp:
@@ -21,16 +26,52 @@ class ParkingSecurityApp:
         self.cap = None
         self.out = None
         self.system = None
+        self.pipeline = None
+        #la vista previa se refresca a PARKWATCH_DISPLAY_FPS (15 por defecto), aparte del ritmo de proceso
+        self.display_fps = float(os.environ.get("PARKWATCH_DISPLAY_FPS", 15))
+        self.poll_interval_ms = max(int(1000 / self.display_fps), 1)
+        #PhotoImage único de la vista previa (se actualiza con paste) y tamaño en pantalla por tamaño de frame
+        self.display_image = None
+        self.display_sizes = {}
         self.start_time = None
         self.frame_count = 0
         self.total_frames = 0
         self.output_video_path = "output_detection.mp4"
         self.report_path = "detection_report.json"
-
-        #reproductor video procesado
-        self.review_cap = None
-        self.review_total_frames = 0
+        self.events_path = "detection_events.jsonl"
+
+        #modelo: se carga y se calienta una vez en segundo plano al abrir la app (core/ultralytics/torch
+        #se importan en ese hilo) y se reutiliza en cada análisis; cada análisis es una sesión nueva
+        #del sistema (ParkingSecuritySystem.reset), con tracker y estado de pares limpios
+        self.model_path = "yolov8m.pt"
+        self.confidence = 0.5
+        self.imgsz = 640
+        self.model = None
+        self.model_error = None
+        self.model_ready = threading.Event()
+        self.app_started = time.perf_counter()
+        self.startup = {}
+        self.runs = 0
+        #tiempo hasta el primer frame: desde el clic en "Iniciar análisis" hasta que se muestra
+        self.run_requested_at = None
+        self.first_frame_shown = False
+
+        #PARKWATCH_PROFILE=1: tiempos por etapa (motor y UI) en consola y en el reporte
+        self.profile = os.environ.get("PARKWATCH_PROFILE") == "1"
+        #PARKWATCH_CLIPS=1: solo clips cortos alrededor de cada alerta, sin el video completo
+        #cada análisis guarda en su propia carpeta clips_alertas/<video>_<fecha>
+        self.clips_mode = os.environ.get("PARKWATCH_CLIPS") == "1"
+        self.clips_root = "clips_alertas"
+        self.clips_dir = None
+        self.clips = None
+
+        #reproductor video procesado (decodificación y caché en review.ReviewReader)
+        self.review_reader = None
+        self.review_target = 0
+        self.review_poll_id = None
+        self.review_alerts = []
         self.review_slider = None
+        self.review_markers = None
         self.video_controls_frame = None
 
         #historial de alertas
@@ -45,6 +86,46 @@ class ParkingSecurityApp:
 
         self.build_layout()
 
+        threading.Thread(target=self.load_model, name="model-loader", daemon=True).start()
+        self.poll_model()
+
+    #hilo de carga: imports pesados, pesos y una inferencia de prueba al tamaño de entrada
+    def load_model(self):
+        try:
+            t0 = time.perf_counter()
+            #solo precarga torch y ultralytics (core los importa)
+            importlib.import_module("core")
+            from backends import load_model, warm_up
+
+            t1 = time.perf_counter()
+            model = load_model(self.model_path, imgsz=self.imgsz)
+            t2 = time.perf_counter()
+            warm_up(model, self.imgsz, conf=self.confidence, iou=0.45)
+            t3 = time.perf_counter()
+            self.startup = {
+                "import_s": t1 - t0,
+                "model_load_s": t2 - t1,
+                "warmup_s": t3 - t2,
+                "ready_after_s": t3 - self.app_started,
+            }
+            self.model = model
+        except Exception as exc:
+            self.model_error = exc
+        finally:
+            self.model_ready.set()
+
+    def poll_model(self):
+        if not self.model_ready.is_set():
+            self.engine_label.config(text="Modelo: cargando en segundo plano...")
+            self.root.after(200, self.poll_model)
+        elif self.model_error is not None:
+            self.engine_label.config(text=f"Modelo: error al cargar ({self.model_error})")
+        else:
+            self.engine_label.config(
+                text=f"Modelo listo en {self.startup['ready_after_s']:.1f}s "
+                f"(calentamiento {self.startup['warmup_s']:.2f}s)"
+            )
+
     def build_layout(self):
         main_frame = tk.Frame(self.root, bg=self.bg_color)
         main_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -187,6 +268,17 @@ class ParkingSecurityApp:
         )
         self.status_label.pack(pady=(0, 5), padx=15, anchor="w")
 
+        self.engine_label = tk.Label(
+            side_frame,
+            text="",
+            bg=self.panel_color,
+            fg=self.text_color,
+            font=("Segoe UI", 8),
+            justify="left",
+            wraplength=260,
+        )
+        self.engine_label.pack(pady=(0, 5), padx=15, anchor="w")
+
         self.progress_label = tk.Label(
             side_frame,
             text="Progreso: 0.0%",
@@ -292,9 +384,7 @@ class ParkingSecurityApp:
             if self.video_controls_frame:
                 self.video_controls_frame.destroy()
                 self.video_controls_frame = None
-            if self.review_cap:
-                self.review_cap.release()
-                self.review_cap = None
+            self.close_review_player()
 
             self.run_button.config(state="normal")
 
@@ -303,6 +393,22 @@ class ParkingSecurityApp:
             messagebox.showwarning("Video no seleccionado", "Primero selecciona un video.")
             return
 
+        if self.run_requested_at is None:
+            self.run_requested_at = time.perf_counter()
+        #el modelo sigue cargando: se reintenta sin bloquear la interfaz
+        if not self.model_ready.is_set():
+            self.run_button.config(state="disabled")
+            self.status_label.config(text="Esperando a que termine de cargar el modelo...")
+            self.root.after(100, self.run_analysis)
+            return
+        if self.model_error is not None:
+            self.run_requested_at = None
+            self.run_button.config(state="normal")
+            messagebox.showerror("Error", f"No se pudo cargar el modelo:\n{self.model_error}")
+            return
+        self.first_frame_shown = False
+        self.startup.pop("time_to_first_frame_s", None)
+
         # Reiniciar estado
         self.frame_count = 0
         self.total_frames = 0
@@ -315,21 +421,40 @@ class ParkingSecurityApp:
             w.destroy()
 
         # Cerrar reproductor previo, si lo hay
-        if self.review_cap:
-            self.review_cap.release()
-            self.review_cap = None
+        self.close_review_player()
         if self.video_controls_frame:
             self.video_controls_frame.destroy()
             self.video_controls_frame = None
 
-        # Crear sistema YOLO
-        self.system = ParkingSecuritySystem(model_path="yolov8m.pt", confidence=0.5)
+        # Sistema sobre el modelo ya cargado (los eventos se van guardando en disco)
+        from core import ParkingSecuritySystem
+
+        remove_log(self.events_path)
+        if self.system is None:
+            self.system = ParkingSecuritySystem(
+                model=self.model,
+                imgsz=self.imgsz,
+                confidence=self.confidence,
+                events_path=self.events_path,
+                profile=self.profile,
+                profile_log_interval=10.0,
+                #los frames leídos no se reutilizan: se dibuja sobre ellos sin copiar, salvo con clips,
+                #donde el hilo de escritura anota el frame del clip mientras la UI puede estar mostrándolo
+                draw_in_place=not self.clips_mode,
+                #con clips solo se dibujan los frames que se escriben (y el que se muestra)
+                annotate=not self.clips_mode,
+            )
+        else:
+            #análisis siguiente: misma instancia, tracker/parejas/eventos desde cero
+            self.system.reset(self.events_path)
 
         # Abrir video
         self.cap = cv2.VideoCapture(self.video_path)
         if not self.cap.isOpened():
             messagebox.showerror("Error", "No se pudo abrir el video seleccionado.")
             self.cap = None
+            self.run_requested_at = None
+            self.run_button.config(state="normal")
             return
 
         fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
@@ -337,8 +462,14 @@ class ParkingSecurityApp:
         height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        self.out = cv2.VideoWriter(self.output_video_path, fourcc, fps, (width, height))
+        if self.clips_mode:
+            stem = os.path.splitext(os.path.basename(self.video_path))[0]
+            self.clips_dir = os.path.join(self.clips_root, f"{stem}_{time.strftime('%Y%m%d_%H%M%S')}")
+            self.clips = ClipRecorder(self.clips_dir, "alerta", fps, draw=self.system.annotate)
+        else:
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            #el índice de frames (.frames.npz) queda junto al video para el reproductor
+            self.out = IndexedVideoWriter(self.output_video_path, fourcc, fps, (width, height))
 
         self.start_time = time.time()
 
@@ -351,40 +482,45 @@ class ParkingSecurityApp:
         self.result_label.config(text="")
         self.root.update_idletasks()
 
-        # Comenzar bucle de frames
+        # Lectura, inferencia y escritura en hilos; la UI solo consulta el último frame
+        self.pipeline = FramePipeline(self.cap, self.system, writer=self.out, clips=self.clips)
+        self.pipeline.start()
         self.update_frame()
 
     def update_frame(self):
-        if self.cap is None:
+        if self.pipeline is None:
             return
 
-        ret, frame = self.cap.read()
-        if not ret:
-            # Fin del video
+        if self.pipeline.error is not None:
+            self.pipeline.stop()
+            error = self.pipeline.error
             self.finish_analysis()
+            messagebox.showerror("Error", f"Falló el procesamiento del video:\n{error}")
             return
 
-        current_time = time.time()
-        processed_frame, alert_count = self.system.process_frame(frame, current_time)
-
-        # Guardar en el video de salida
-        if self.out:
-            self.out.write(processed_frame)
-
-        self.frame_count += 1
-
-        # Mostrar en la interfaz (convertir BGR -> RGB -> ImageTk)
-        frame_rgb = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(frame_rgb)
-
-        # Redimensionar para que quepa en el contenedor de video (contenedor fijo)
-        label_width = self.video_container.winfo_width() or 800
-        label_height = self.video_container.winfo_height() or 450
-        img.thumbnail((label_width, label_height), Image.LANCZOS)
+        latest = self.pipeline.latest()
+        if latest is None:
+            if self.pipeline.done:
+                # Fin del video
+                self.finish_analysis()
+            else:
+                self.root.after(self.poll_interval_ms, self.update_frame)
+            return
 
-        imgtk = ImageTk.PhotoImage(image=img)
-        self.video_label_widget.config(image=imgtk)
-        self.video_label_widget.image = imgtk  # evitar GC
+        processed_frame, alert_count, self.frame_count, overlay = latest
+        profiler = self.system.profiler
+        t = profiler.clock()
+        if overlay is not None:
+            #frame sin dibujar (modo clips): se anota una copia, el original puede ir a un clip
+            processed_frame = self.system.draw_detections(processed_frame, *overlay)
+
+        # Mostrar en la interfaz: se reduce primero y se convierte a RGB solo la imagen chica
+        small = cv2.resize(processed_frame, self.display_size(processed_frame), interpolation=cv2.INTER_AREA)
+        self.show_rgb(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        t = profiler.record("display", t)
+        if not self.first_frame_shown:
+            self.first_frame_shown = True
+            self.startup["time_to_first_frame_s"] = time.perf_counter() - self.run_requested_at
 
         # Progreso
         if self.total_frames > 0:
@@ -396,8 +532,10 @@ class ParkingSecurityApp:
             text=f"Progreso: {progress:.1f}%  |  Frames: {self.frame_count}/{self.total_frames or '?'}"
         )
 
+        #eventos nuevos y total en una sola lectura bajo el lock del búfer (el hilo de inferencia sigue agregando)
+        new_events, total_alerts = self.system.suspicious_events.since(self.last_alert_index)
+
         # Alertas activas (para el frame actual)
-        total_alerts = len(self.system.suspicious_events)
         if alert_count > 0:
             self.alert_status_label.config(
                 text=f"ALERTAS ACTIVAS: {alert_count} (Total acumuladas: {total_alerts})"
@@ -408,76 +546,105 @@ class ParkingSecurityApp:
             )
 
         # Actualizar historial de alertas (tarjetas verdes nuevas)
-        if self.system and len(self.system.suspicious_events) > self.last_alert_index:
-            new_events = self.system.suspicious_events[self.last_alert_index :]
-            for ev in new_events:
-                dur = ev.get("duration", 0.0)
-                dist = ev.get("distance", 0.0)
-                ts = ev.get("timestamp", "")
-                text = (
-                    f"{ts}\n"
-                    f"Comportamiento sospechoso detectado\n"
-                    f"Duración: {dur:.1f}s  |  Distancia: {dist:.1f}"
-                )
-                card = tk.Label(
-                    self.alerts_frame,
-                    text=text,
-                    bg="#8a0000",
-                    fg="white",
-                    font=("Segoe UI", 8),
-                    justify="left",
-                    wraplength=240,
-                    anchor="w",
-                    padx=6,
-                    pady=4,
-                )
-                card.pack(fill="x", pady=2, anchor="w")
-            self.last_alert_index = len(self.system.suspicious_events)
-
-        # Programar siguiente frame
-        self.root.after(1, self.update_frame)
+        for ev in new_events:
+            dur = ev.get("duration", 0.0)
+            dist = ev.get("distance", 0.0)
+            ts = ev.get("timestamp", "")
+            video_time = ev.get("video_time", 0.0)
+            text = (
+                f"{ts}  (video {video_time:.1f}s)\n"
+                f"Comportamiento sospechoso detectado\n"
+                f"Duración: {dur:.1f}s  |  Distancia: {dist:.1f}"
+            )
+            card = tk.Label(
+                self.alerts_frame,
+                text=text,
+                bg="#8a0000",
+                fg="white",
+                font=("Segoe UI", 8),
+                justify="left",
+                wraplength=240,
+                anchor="w",
+                padx=6,
+                pady=4,
+            )
+            card.pack(fill="x", pady=2, anchor="w")
+        self.last_alert_index = total_alerts
+        profiler.record("ui_update", t)
+
+        # Programar siguiente consulta
+        self.root.after(self.poll_interval_ms, self.update_frame)
+
+    #tamaño que cabe en el contenedor de video (solo se reduce, manteniendo la proporción)
+    def display_size(self, frame):
+        height, width = frame.shape[:2]
+        size = self.display_sizes.get((width, height))
+        if size is None:
+            label_width = self.video_container.winfo_width() or 800
+            label_height = self.video_container.winfo_height() or 450
+            scale = min(label_width / width, label_height / height, 1.0)
+            size = self.display_sizes[(width, height)] = (max(int(width * scale), 1), max(int(height * scale), 1))
+        return size
+
+    #muestra un frame RGB ya reducido; el mismo PhotoImage se reutiliza mientras no cambie el tamaño
+    def show_rgb(self, frame_rgb):
+        image = Image.fromarray(frame_rgb)
+        if self.display_image is not None and (self.display_image.width(), self.display_image.height()) == image.size:
+            self.display_image.paste(image)
+            return
+        self.display_image = ImageTk.PhotoImage(image=image)
+        self.video_label_widget.config(image=self.display_image)
 
     def finish_analysis(self):
-        # Cerrar recursos
+        # Esperar a que el escritor vacíe su cola y cerrar recursos
+        if self.pipeline:
+            self.pipeline.join()
+            self.frame_count = self.pipeline.frame_count
+            self.pipeline = None
         if self.cap:
             self.cap.release()
             self.cap = None
         if self.out:
             self.out.release()
             self.out = None
+        if self.clips:
+            self.clips.close()
 
         elapsed_time = time.time() - self.start_time if self.start_time else 0.0
-        total_alerts = len(self.system.suspicious_events) if self.system else 0
+        total_alerts = self.system.suspicious_events.total if self.system else 0
 
         stats = {
             "total_frames": self.frame_count,
             "processing_time": elapsed_time,
             "total_alerts": total_alerts,
-            "output_path": self.output_video_path,
+            "output_path": None if self.clips else self.output_video_path,
+            "events_path": self.events_path,
         }
+        if self.clips:
+            stats["clips"] = self.clips.summary()
+        stats["startup"] = dict(self.startup, model_reused=self.runs > 0)
+        self.runs += 1
+        self.run_requested_at = None
 
         # Crear reporte JSON
-        report = {
-            "execution_date": time.strftime("%Y-%m-%dT%H:%M:%S"),
-            "statistics": stats,
-            "configuration": {
-                "confidence_threshold": self.system.confidence if self.system else 0.5,
-                "proximity_threshold": self.system.proximity_threshold if self.system else 100,
-                "loitering_time_threshold": self.system.loitering_time_threshold if self.system else 5,
-            },
-            "suspicious_events": (self.system.suspicious_events[-10:] if self.system else []),
-        }
-
-        with open(self.report_path, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        report = build_report(self.system, stats)
+        write_report(self.report_path, report)
+        if self.system:
+            self.system.close()
 
         # Info de archivo
-        if os.path.exists(self.output_video_path):
+        if self.clips:
+            size_bytes = sum(os.path.getsize(c["path"]) for c in self.clips.clips if os.path.exists(c["path"]))
+            size_txt = f"{size_bytes / (1024 * 1024):.2f} MB en {len(self.clips.clips)} clips"
+            video_txt = os.path.abspath(self.clips_dir)
+        elif os.path.exists(self.output_video_path):
             size_bytes = os.path.getsize(self.output_video_path)
             size_mb = size_bytes / (1024 * 1024)
             size_txt = f"{size_mb:.2f} MB"
+            video_txt = os.path.abspath(self.output_video_path)
         else:
             size_txt = "desconocido"
+            video_txt = os.path.abspath(self.output_video_path)
 
         fps_promedio = (
             self.frame_count / elapsed_time if elapsed_time > 0 else 0.0
@@ -489,8 +656,9 @@ class ParkingSecurityApp:
             text=(
                 f"Frames: {self.frame_count} | Alertas: {total_alerts}\n"
                 f"Tiempo: {elapsed_time:.2f}s | FPS promedio: {fps_promedio:.2f}\n"
+                f"Primer frame: {self.startup.get('time_to_first_frame_s', 0.0):.2f}s tras iniciar\n"
                 f"Tamaño video: {size_txt}\n"
-                f"Video: {os.path.abspath(self.output_video_path)}\n"
+                f"Video: {video_txt}\n"
                 f"Reporte JSON: {os.path.abspath(self.report_path)}"
             )
         )
@@ -499,12 +667,14 @@ class ParkingSecurityApp:
         self.select_button.config(state="normal")
 
         # Configurar reproductor del video generado (slider para adelantar/atrasar)
-        self.setup_result_player()
+        if not self.clips:
+            self.setup_result_player()
+        self.clips = None
 
         messagebox.showinfo(
             "Análisis completado",
             "El procesamiento ha terminado.\n\n"
-            f"Video generado:\n{os.path.abspath(self.output_video_path)}\n\n"
+            f"Video generado:\n{video_txt}\n\n"
             f"Reporte JSON:\n{os.path.abspath(self.report_path)}",
         )
 
@@ -512,12 +682,17 @@ class ParkingSecurityApp:
     def setup_result_player(self):
         if not os.path.exists(self.output_video_path):
             return
-        
-        if self.review_cap:
-            self.review_cap.release()
 
-        self.review_cap = cv2.VideoCapture(self.output_video_path)
-        self.review_total_frames = int(self.review_cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.close_review_player()
+        label_width = self.video_container.winfo_width() or 800
+        label_height = self.video_container.winfo_height() or 450
+        try:
+            self.review_reader = ReviewReader(self.output_video_path, (label_width, label_height))
+        except IOError:
+            return
+        total_frames = len(self.review_reader)
+        #marcas de alerta desde el registro de eventos
+        self.review_alerts = alert_frames(self.events_path, self.review_reader.index).tolist()
 
         #controles
         if self.video_controls_frame:
@@ -530,7 +705,7 @@ class ParkingSecurityApp:
 
         slider_label = tk.Label(
             self.video_controls_frame,
-            text="Mueve la barra para adelantar o atrasar el video",
+            text="Mueve la barra para adelantar o atrasar el video (marcas rojas: alertas)",
             bg=self.panel_color,
             fg=self.subtle_text,
             font=("Segoe UI", 9),
@@ -539,12 +714,13 @@ class ParkingSecurityApp:
         )
         slider_label.pack(anchor="w", pady=(0, 2))
 
+        slider_length = 700
         self.review_slider = tk.Scale(
             self.video_controls_frame,
             from_=0,
-            to=max(self.review_total_frames - 1, 0),
+            to=max(total_frames - 1, 0),
             orient="horizontal",
-            length=700,
+            length=slider_length,
             showvalue=False,
             command=self.on_review_slider_change,
             bg=self.panel_color,
@@ -554,32 +730,103 @@ class ParkingSecurityApp:
         )
         self.review_slider.pack(anchor="w")
 
+        #una línea por alerta bajo el slider; clic = saltar a la alerta más cercana
+        self.review_markers = tk.Canvas(
+            self.video_controls_frame,
+            width=slider_length,
+            height=10,
+            bg=self.panel_color,
+            highlightthickness=0,
+        )
+        self.review_markers.pack(anchor="w")
+        for frame_index in self.review_alerts:
+            x = self.marker_x(frame_index)
+            self.review_markers.create_line(x, 0, x, 10, fill="#ef4444", width=2)
+        self.review_markers.bind("<Button-1>", self.on_marker_click)
+
+        buttons = tk.Frame(self.video_controls_frame, bg=self.panel_color)
+        buttons.pack(anchor="w", pady=(4, 0))
+        for column, (text, direction) in enumerate((("◀ Alerta anterior", -1), ("Alerta siguiente ▶", 1))):
+            tk.Button(
+                buttons,
+                text=text,
+                command=lambda d=direction: self.step_alert(d),
+                bg="#111827",
+                fg=self.text_color,
+                activebackground="#1f2937",
+                activeforeground=self.text_color,
+                relief="flat",
+                font=("Segoe UI", 9),
+                padx=8,
+                state="normal" if self.review_alerts else "disabled",
+            ).grid(row=0, column=column, padx=(0, 6))
+
         self.show_review_frame(0)
 
+    #posición en pixeles de un frame sobre el slider (descontando el ancho del cursor)
+    def marker_x(self, frame_index, handle=30):
+        total_frames = len(self.review_reader)
+        length = int(self.review_markers["width"])
+        if total_frames <= 1:
+            return handle / 2
+        return handle / 2 + frame_index / (total_frames - 1) * (length - handle)
+
+    def on_marker_click(self, event):
+        if self.review_alerts:
+            self.jump_to_alert(min(self.review_alerts, key=lambda f: abs(self.marker_x(f) - event.x)))
+
+    def jump_to_alert(self, frame_index):
+        self.review_slider.set(frame_index)
+        self.show_review_frame(frame_index)
+
+    def step_alert(self, direction):
+        if not self.review_alerts:
+            return
+        current = self.review_target
+        if direction > 0:
+            candidates = [f for f in self.review_alerts if f > current]
+            target = candidates[0] if candidates else self.review_alerts[-1]
+        else:
+            candidates = [f for f in self.review_alerts if f < current]
+            target = candidates[-1] if candidates else self.review_alerts[0]
+        self.jump_to_alert(target)
+
+    def close_review_player(self):
+        if self.review_poll_id is not None:
+            self.root.after_cancel(self.review_poll_id)
+            self.review_poll_id = None
+        if self.review_reader:
+            self.review_reader.close()
+            self.review_reader = None
+
     #mover el slider
     def on_review_slider_change(self, value):
         idx = int(float(value))
         self.show_review_frame(idx)
 
+    #muestra el frame si ya está en caché; si no, lo pide al hilo decodificador y consulta hasta tenerlo
     def show_review_frame(self, frame_index):
-        if not self.review_cap:
+        if not self.review_reader:
             return
 
-        self.review_cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
-        ret, frame = self.review_cap.read()
-        if not ret:
-            return
+        self.review_target = frame_index
+        #también con el frame en caché: mueve el prefetch a esta posición
+        self.review_reader.request(frame_index)
+        if not self.display_review_frame() and self.review_poll_id is None:
+            self.review_poll_id = self.root.after(10, self.poll_review_frame)
 
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(frame_rgb)
+    def poll_review_frame(self):
+        self.review_poll_id = None
+        if self.review_reader and not self.display_review_frame():
+            self.review_poll_id = self.root.after(10, self.poll_review_frame)
 
-        label_width = self.video_container.winfo_width() or 800
-        label_height = self.video_container.winfo_height() or 450
-        img.thumbnail((label_width, label_height), Image.LANCZOS)
+    def display_review_frame(self):
+        frame = self.review_reader.get(self.review_target)
+        if frame is None:
+            return False
 
-        imgtk = ImageTk.PhotoImage(image=img)
-        self.video_label_widget.config(image=imgtk)
-        self.video_label_widget.image = imgtk  # evitar GC
+        self.show_rgb(frame)
+        return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+# backends.py
+# Motores de inferencia: PyTorch, ONNX Runtime u OpenVINO. Los modelos exportados se guardan en caché
+# según el hash de los pesos, el tamaño de entrada y la precisión, y se reutilizan en los siguientes arranques.
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+BACKENDS = ("torch", "onnx", "openvino")
+PRECISIONS = ("fp32", "fp16", "int8")
+CACHE_DIR = "modelos_exportados"
+
+
+def weights_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _check_options(backend, precision, calibration_data=None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precisión desconocida: {precision} (opciones: {', '.join(PRECISIONS)})")
+    if backend == "torch" and precision != "fp32":
+        raise ValueError("La cuantización solo aplica a los modelos exportados (onnx/openvino)")
+    if backend == "onnx" and precision == "fp16":
+        raise ValueError("ONNX en FP16 requiere GPU; en CPU use openvino con fp16 o onnx con int8")
+    #INT8 se calibra con imágenes (cuantización estática); sin datos propios ultralytics descarga su
+    #dataset por defecto al exportar (falla sin red)
+    if precision == "int8" and not calibration_data:
+        raise ValueError(
+            "INT8 necesita datos de calibración: indique --calibration-data con el yaml de un dataset "
+            "local (imágenes del estacionamiento)"
+        )
+
+
+#ruta del modelo exportado en caché (archivo .onnx o carpeta de OpenVINO); en INT8 la clave incluye
+#el yaml de calibración: otros datos dan otro modelo
+def cached_model_path(weights_path, backend, imgsz, precision, cache_dir=CACHE_DIR, calibration_data=None):
+    name = os.path.splitext(os.path.basename(weights_path))[0]
+    key = f"{name}-{weights_hash(weights_path)[:16]}-{imgsz}-{precision}"
+    if precision == "int8" and calibration_data and os.path.exists(calibration_data):
+        key += f"-cal{weights_hash(calibration_data)[:8]}"
+    if backend == "onnx":
+        return os.path.join(cache_dir, f"{key}.onnx")
+    return os.path.join(cache_dir, f"{key}_openvino_model")
+
+
+#exporta una vez y devuelve la ruta en caché; `calibration_data` (yaml de dataset) calibra INT8
+def export_model(model_path, backend, imgsz=640, precision="fp32", cache_dir=CACHE_DIR, calibration_data=None):
+    #ultralytics (y torch) se importan recién aquí: los argumentos de línea de comandos y la
+    #interfaz arrancan sin esperar a cargarlos
+    from ultralytics import YOLO
+    from ultralytics.utils.downloads import attempt_download_asset
+
+    _check_options(backend, precision, calibration_data)
+    weights_path = attempt_download_asset(model_path)
+    target = cached_model_path(weights_path, backend, imgsz, precision, cache_dir, calibration_data)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    #se exporta en una carpeta temporal y se mueve al final: otro proceso nunca ve un archivo a medias
+    with tempfile.TemporaryDirectory(dir=cache_dir) as work_dir:
+        work_weights = os.path.join(work_dir, os.path.basename(weights_path))
+        shutil.copy(weights_path, work_weights)
+
+        options = dict(format=backend, imgsz=imgsz, dynamic=True)
+        if backend == "openvino":
+            options["half"] = precision == "fp16"
+        #INT8 estático en los dos backends: ONNX Runtime (quantize_static, solo Conv/Gemm/MatMul; la
+        #decodificación de la cabeza queda en float) u OpenVINO (NNCF), calibrados con las mismas imágenes
+        if precision == "int8":
+            options.update(int8=True, data=calibration_data)
+        exported = YOLO(work_weights).export(**options)
+
+        if not os.path.exists(target):
+            os.replace(exported, target)
+    return target
+
+
+#YOLO listo para predict con el backend pedido
+def load_model(model_path="yolov8m.pt", backend="torch", imgsz=640, precision="fp32", cache_dir=CACHE_DIR,
+               calibration_data=None):
+    from ultralytics import YOLO
+
+    _check_options(backend, precision, calibration_data)
+    if backend == "torch":
+        return YOLO(model_path)
+    return YOLO(export_model(model_path, backend, imgsz, precision, cache_dir, calibration_data), task="detect")
+
+
+#inferencias de prueba a imgsz: el primer frame real no paga la creación del predictor ni la
+#inicialización del backend; devuelve los segundos que tardó
+def warm_up(model, imgsz=640, batch_size=1, runs=1, **predict_args):
+    dummy = [np.zeros((imgsz, imgsz, 3), dtype=np.uint8)] * max(int(batch_size), 1)
+    start = time.perf_counter()
+    for _ in range(runs):
+        model.predict(dummy, imgsz=imgsz, verbose=False, **predict_args)
+    return time.perf_counter() - start
+
+
+def add_backend_arguments(parser):
+    parser.add_argument("--backend", choices=BACKENDS, default="torch", help="motor de inferencia")
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32", help="precisión del modelo exportado")
+    parser.add_argument("--imgsz", type=int, default=640, help="tamaño de entrada del modelo")
+    parser.add_argument(
+        "--calibration-data",
+        default=None,
+        help="yaml de un dataset local para calibrar INT8 (obligatorio con --precision int8)",
+    )
+
+
+#combinaciones inválidas como error de argparse, antes de abrir cámaras o videos
+def check_backend_arguments(parser, args):
+    try:
+        _check_options(args.backend, args.precision, args.calibration_data)
+    except ValueError as exc:
+        parser.error(str(exc))
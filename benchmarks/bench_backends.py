@@ -0,0 +1,171 @@
+# bench_backends.py
+# Latencia y precisión de ONNX Runtime / OpenVINO frente a PyTorch sobre el mismo video. Con un dataset
+# etiquetado (--val-data, por defecto el de --calibration-data) también mide mAP, y cada precisión reducida
+# (int8, fp16) se compara con FP32 del mismo backend: latencia y mAP perdido.
+#   python benchmarks/bench_backends.py videos/prueba.mp4 --frames 300
+#   python benchmarks/bench_backends.py videos/prueba.mp4 --configs onnx:fp32 onnx:int8 --calibration-data estacionamiento.yaml
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backends import load_model
+from clock import VideoClock
+from core import ParkingSecuritySystem
+from proximity import iou_matrix
+
+#personas y vehículos, las clases que usa el sistema
+CLASSES = [0, 2, 3, 5, 7]
+
+
+def read_frames(video_path, n_frames):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise SystemExit(f"No se pudo abrir el video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    frames = []
+    while len(frames) < n_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames, fps
+
+
+#detecciones (xyxy, cls) por frame y latencia de cada predict
+def detect(model, frames, imgsz, confidence, warmup=3):
+    for frame in frames[:warmup]:
+        model.predict(frame, conf=confidence, imgsz=imgsz, verbose=False)
+
+    detections = []
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        result = model.predict(frame, conf=confidence, imgsz=imgsz, verbose=False)[0]
+        latencies.append(time.perf_counter() - start)
+
+        boxes = result.boxes
+        keep = np.isin(boxes.cls.cpu().numpy(), CLASSES)
+        detections.append((boxes.xyxy.cpu().numpy()[keep], boxes.cls.cpu().numpy()[keep]))
+    return detections, np.asarray(latencies)
+
+
+#coincidencias con la referencia por clase (IoU >= min_iou, emparejamiento voraz)
+def agreement(reference, candidate, min_iou=0.5):
+    matched = 0
+    ious = []
+    n_reference = 0
+    n_candidate = 0
+    for (ref_boxes, ref_cls), (cand_boxes, cand_cls) in zip(reference, candidate):
+        n_reference += len(ref_boxes)
+        n_candidate += len(cand_boxes)
+        for cls in np.unique(ref_cls):
+            a = ref_boxes[ref_cls == cls]
+            b = cand_boxes[cand_cls == cls]
+            if not len(b):
+                continue
+            iou = iou_matrix(a, b)
+            while iou.size and iou.max() >= min_iou:
+                i, j = np.unravel_index(iou.argmax(), iou.shape)
+                ious.append(iou[i, j])
+                matched += 1
+                iou[i, :] = 0
+                iou[:, j] = 0
+
+    recall = matched / n_reference if n_reference else 1.0
+    precision = matched / n_candidate if n_candidate else 1.0
+    return {
+        "recall": recall,
+        "precision": precision,
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+    }
+
+
+#mAP50-95 y mAP50 sobre el split de validación del dataset (clases de COCO en las etiquetas)
+def dataset_map(model, data, imgsz):
+    metrics = model.val(data=data, imgsz=imgsz, batch=1, plots=False, verbose=False)
+    return float(metrics.box.map), float(metrics.box.map50)
+
+
+def count_alerts(model, frames, fps, imgsz, confidence):
+    system = ParkingSecuritySystem(model=model, imgsz=imgsz, confidence=confidence)
+    clock = VideoClock(None, fps=fps)
+    for frame in frames:
+        system.process_frame(frame, clock.tick())
+    return system.suspicious_events.total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyTorch vs ONNX Runtime / OpenVINO")
+    parser.add_argument("video")
+    parser.add_argument("--model", default="yolov8m.pt")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--confidence", type=float, default=0.5)
+    parser.add_argument("--calibration-data", default=None, help="yaml de dataset local para calibrar int8")
+    parser.add_argument("--val-data", default=None, help="yaml de dataset etiquetado para el mAP (por defecto --calibration-data)")
+    parser.add_argument("--max-map-drop", type=float, default=0.01, help="mAP que puede perder una precisión reducida")
+    parser.add_argument("--min-speedup", type=float, default=1.1, help="aceleración mínima contra FP32 del mismo backend")
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        default=["torch:fp32", "onnx:fp32", "onnx:int8", "openvino:fp32", "openvino:fp16"],
+        help="backend:precisión; la primera es la referencia",
+    )
+    args = parser.parse_args()
+
+    val_data = args.val_data or args.calibration_data
+    frames, fps = read_frames(args.video, args.frames)
+    print(f"{len(frames)} frames de {args.video}, imgsz {args.imgsz}, mAP con {val_data or '-'}\n")
+    print(f"{'config':>14} {'carga s':>8} {'p50 ms':>8} {'p95 ms':>8} {'FPS':>7} "
+          f"{'recall':>7} {'precis.':>7} {'IoU':>6} {'alertas':>8} {'mAP':>6} {'mAP50':>6}")
+
+    reference = None
+    measured = {}
+    for config in args.configs:
+        backend, precision = config.split(":")
+        start = time.perf_counter()
+        try:
+            model = load_model(args.model, backend, args.imgsz, precision, calibration_data=args.calibration_data)
+        except (ImportError, ValueError) as exc:
+            print(f"{config:>14} no disponible: {exc}")
+            continue
+        load_time = time.perf_counter() - start
+
+        detections, latencies = detect(model, frames, args.imgsz, args.confidence)
+        if reference is None:
+            reference = detections
+        quality = agreement(reference, detections)
+        alerts = count_alerts(model, frames, fps, args.imgsz, args.confidence)
+        box_map, box_map50 = dataset_map(model, val_data, args.imgsz) if val_data else (None, None)
+        measured[(backend, precision)] = (np.percentile(latencies, 50), box_map)
+
+        maps = f"{box_map:>6.3f} {box_map50:>6.3f}" if val_data else f"{'-':>6} {'-':>6}"
+        print(
+            f"{config:>14} {load_time:>8.2f} {np.percentile(latencies, 50) * 1000:>8.1f} "
+            f"{np.percentile(latencies, 95) * 1000:>8.1f} {1 / latencies.mean():>7.1f} "
+            f"{quality['recall']:>7.3f} {quality['precision']:>7.3f} {quality['mean_iou']:>6.3f} {alerts:>8} {maps}"
+        )
+
+    #precisiones reducidas contra FP32 del mismo backend: conviene si acelera sin perder mAP
+    for (backend, precision), (latency, box_map) in measured.items():
+        base = measured.get((backend, "fp32"))
+        if precision == "fp32" or base is None:
+            continue
+        speedup = base[0] / latency
+        line = f"{backend}:{precision} contra {backend}:fp32: {speedup:.2f}x"
+        if box_map is None:
+            print(f"{line}, sin mAP (indique --val-data para decidir)")
+            continue
+        drop = base[1] - box_map
+        worth = speedup >= args.min_speedup and drop <= args.max_map_drop
+        print(f"{line}, mAP {-drop:+.3f} -> {'conviene' if worth else 'no conviene'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# bench_draw.py
+# Costo por frame de extraer las cajas y anotar: versión anterior (tensor por caja + frame.copy())
+# contra arrays numpy reutilizados y dibujo sobre el mismo frame. La extracción sola (sin dibujo)
+# debe quedar casi constante con la cantidad de cajas. No necesita red ni pesos de YOLO.
+#   python benchmarks/bench_draw.py
+#   python benchmarks/bench_draw.py --sizes 3840x2160 --boxes 20 200
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import ParkingSecuritySystem, detection_arrays
+from synthetic import NAMES
+
+
+#resultado con tracks: mitad personas, mitad vehículos repartidos por el frame
+def make_result(frame, n_boxes, seed=0):
+    rng = np.random.default_rng(seed)
+    height, width = frame.shape[:2]
+    x1 = rng.uniform(0, width - 120, n_boxes)
+    y1 = rng.uniform(40, height - 200, n_boxes)
+    data = np.zeros((n_boxes, 7), dtype=np.float32)
+    data[:, 0] = x1
+    data[:, 1] = y1
+    data[:, 2] = x1 + rng.uniform(30, 120, n_boxes)
+    data[:, 3] = y1 + rng.uniform(60, 200, n_boxes)
+    data[:, 4] = np.arange(1, n_boxes + 1)
+    data[:, 5] = 0.9
+    data[:, 6] = np.where(np.arange(n_boxes) % 2, 2, 0)
+    return Results(frame, "bench", NAMES, boxes=torch.as_tensor(data))
+
+
+#extracción y dibujado como estaban antes de reutilizar los arrays
+def legacy_extract(system, results):
+    persons, vehicles = [], []
+    for result in results:
+        for box in result.boxes:
+            track_id = int(box.id[0]) if box.id is not None else None
+            if track_id is None:
+                continue
+            cls = int(box.cls[0])
+            bbox = box.xyxy[0].cpu().numpy()
+            if cls == system.person_class:
+                persons.append((track_id, bbox))
+            elif cls in system.vehicle_classes:
+                vehicles.append((track_id, bbox))
+    return persons, vehicles
+
+
+def legacy_frame(system, frame, results):
+    legacy_extract(system, results)
+    annotated_frame = frame.copy()
+    for result in results:
+        for box in result.boxes:
+            x1, y1, x2, y2 = map(int, box.xyxy[0])
+            float(box.conf[0])
+            cls = int(box.cls[0])
+            track_id = int(box.id[0]) if box.id is not None else -1
+            if cls == system.person_class:
+                color, label = (255, 255, 0), f"Persona {track_id}"
+            elif cls in system.vehicle_classes:
+                color, label = (0, 255, 0), f"Vehiculo {track_id}"
+            else:
+                continue
+            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(annotated_frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return annotated_frame
+
+
+def current_frame(system, frame, results, in_place):
+    detections = detection_arrays(results)
+    system.split_tracks(detections)
+    return system.draw_detections(frame, detections, [], in_place=in_place)
+
+
+#solo la extracción (modo sin salida de video)
+def headless_frame(system, frame, results):
+    system.split_tracks(detection_arrays(results))
+    return frame
+
+
+def measure(fn, frame, repeats):
+    times = np.zeros(repeats)
+    for i in range(repeats):
+        #el dibujo sobre el mismo frame necesita un frame nuevo cada vez (como al leer del video)
+        work = frame.copy()
+        t0 = time.perf_counter()
+        fn(work)
+        times[i] = time.perf_counter() - t0
+    return times * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo de anotar cada frame")
+    parser.add_argument("--sizes", nargs="+", default=["1920x1080", "3840x2160"])
+    parser.add_argument("--boxes", nargs="+", type=int, default=[10, 50, 200])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    system = ParkingSecuritySystem(model=object())
+    print(f"{'frame':>10} {'cajas':>6} {'anterior ms':>12} {'arrays ms':>10} {'in place ms':>12} "
+          f"{'extr. ant. ms':>14} {'extr. ms':>9} {'ahorro':>7}")
+    for size in args.sizes:
+        width, height = (int(v) for v in size.split("x"))
+        frame = np.full((height, width, 3), 90, dtype=np.uint8)
+        for n_boxes in args.boxes:
+            results = [make_result(frame, n_boxes)]
+            #misma imagen con las dos versiones
+            same = np.array_equal(
+                legacy_frame(system, frame, results), current_frame(system, frame, results, in_place=False)
+            )
+            if not same:
+                raise SystemExit("la anotación no coincide con la versión anterior")
+
+            legacy = measure(lambda f: legacy_frame(system, f, results), frame, args.repeats)
+            copied = measure(lambda f: current_frame(system, f, results, in_place=False), frame, args.repeats)
+            in_place = measure(lambda f: current_frame(system, f, results, in_place=True), frame, args.repeats)
+            legacy_extraction = measure(lambda f: legacy_extract(system, results), frame, args.repeats)
+            headless = measure(lambda f: headless_frame(system, f, results), frame, args.repeats)
+            saving = 1 - np.median(in_place) / np.median(legacy)
+            print(
+                f"{size:>10} {n_boxes:>6} {np.median(legacy):>12.2f} {np.median(copied):>10.2f} "
+                f"{np.median(in_place):>12.2f} {np.median(legacy_extraction):>14.3f} "
+                f"{np.median(headless):>9.3f} {saving * 100:>6.0f}%"
+            )
+
+
+if __name__ == "__main__":
+    main()
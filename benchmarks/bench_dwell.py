@@ -0,0 +1,130 @@
+# bench_dwell.py
+# Historial de tracks (dwell.py) sobre escenas sintéticas: costo por frame de registrarlo, tamaño en
+# disco, tiempos de consulta sobre todos los videos juntos y permanencias contra el guion. El historial
+# escrito en segmentos cortos (--segment) debe dar las mismas columnas que uno de un solo segmento.
+# No necesita red ni pesos de YOLO.
+#   python benchmarks/bench_dwell.py
+#   python benchmarks/bench_dwell.py --videos 50 --duration 120
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_scenes import script_ids
+from core import ParkingSecuritySystem
+from dwell import history_segments, load_dwell
+from synthetic import BRIEF, LOITER, OVERLAP, SPEED, TOUCH, ParkingScene, StubDetector
+
+
+#una pasada; devuelve (ms por frame, ids del tracker -> ids del guion en cada frame)
+def run(scene, history_path, history_segment=300.0):
+    system = ParkingSecuritySystem(
+        model=StubDetector(scene), annotate=False, history_path=history_path, history_segment=history_segment
+    )
+    frames = [scene.render(f) for f in range(scene.n_frames)]
+    mappings = []
+    elapsed = 0.0
+    for f, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        system.process_frame(frame, scene.time(f))
+        elapsed += time.perf_counter() - t0
+        mappings.append(script_ids(scene, f, system.last_tracks))
+    system.close()
+    return elapsed / scene.n_frames * 1000, mappings
+
+
+#segundos que cada persona del guion pasa cerca de su auto: {(persona, vehiculo): segundos}
+def scripted_dwell(scene):
+    last_time = scene.time(scene.n_frames - 1)
+    dwell = {}
+    for walk in scene.walks:
+        if walk.kind not in (LOITER, BRIEF) or walk.touch_time > last_time:
+            continue
+        leave = walk.waypoints[3, 0] + (OVERLAP - TOUCH) / SPEED
+        dwell[(walk.person_id, walk.vehicle_id)] = min(leave, last_time) - walk.touch_time
+    return dwell
+
+
+def timed(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historial de tracks y consultas de permanencia")
+    parser.add_argument("--videos", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--vehicles", type=int, default=24)
+    parser.add_argument("--persons", type=int, default=30)
+    parser.add_argument("--segment", type=float, default=10.0, help="segundos de video por segmento del historial")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        base_ms = []
+        history_ms = []
+        errors = []
+        missing = 0
+        mismatched = 0
+        for seed in range(args.videos):
+            scene = ParkingScene(args.vehicles, args.persons, duration=args.duration, seed=seed)
+            path = os.path.join(tmp, f"video{seed}_dwell.npz")
+            base_ms.append(run(scene, None)[0])
+            ms, mappings = run(scene, path, args.segment)
+            history_ms.append(ms)
+            paths.append(path)
+
+            single = os.path.join(tmp, f"video{seed}_single.npz")
+            run(scene, single)
+            segmented, whole = load_dwell(path).columns, load_dwell(single).columns
+            mismatched += any(not np.array_equal(segmented[name], whole[name]) for name in whole)
+
+            #intervalos con ids del guion (los del frame del medio: dos personas que se cruzan pueden
+            #intercambiar ids en otro momento), sumados por pareja
+            data = load_dwell(path)
+            measured = {}
+            for person, vehicle, start, end in zip(
+                data["pair_person"].tolist(), data["pair_vehicle"].tolist(),
+                data["pair_start"].tolist(), data["pair_end"].tolist(),
+            ):
+                mapping = mappings[min(int(round((start + end) / 2 * scene.fps)), scene.n_frames - 1)]
+                duration = end - start
+                key = (mapping.get(person), mapping.get(vehicle))
+                measured[key] = measured.get(key, 0.0) + duration
+            for key, expected in scripted_dwell(scene).items():
+                if key in measured:
+                    errors.append(abs(measured[key] - expected))
+                else:
+                    missing += 1
+
+        segments = [segment for p in paths for segment in history_segments(p)]
+        size = sum(os.path.getsize(segment) for segment in segments)
+        t0 = time.perf_counter()
+        index = load_dwell(paths)
+        load_ms = (time.perf_counter() - t0) * 1000
+        summary = index.summary()
+
+        print(f"Videos: {args.videos} x {args.duration:.0f}s | muestras: {summary['samples']} | "
+              f"intervalos: {summary['pair_intervals']}")
+        print(f"Costo por frame: {np.mean(base_ms):.2f} ms sin historial, {np.mean(history_ms):.2f} ms con historial")
+        print(f"En disco: {size / 1024:.1f} KB ({size / args.videos / 1024:.1f} KB por video, "
+              f"{len(segments)} segmentos de {args.segment:.0f}s)")
+        print(f"Permanencia contra el guion: error medio {np.mean(errors) if errors else 0.0:.2f}s, "
+              f"máximo {max(errors, default=0.0):.2f}s, parejas sin intervalo {missing}")
+        print(f"Consultas (ms): carga {load_ms:.1f} | por vehículo {timed(index.dwell_per_vehicle):.2f} | "
+              f"varios vehículos {timed(index.multi_vehicle_persons):.2f} | "
+              f"mapa de paradas {timed(index.stop_heatmap):.2f}")
+        if mismatched:
+            raise SystemExit(f"{mismatched} historiales en segmentos no coinciden con el de un solo segmento")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench_proximity.py
+# Compara el bucle por parejas con el modo vectorizado de detect_suspicious_activity.
+#   python benchmarks/bench_proximity.py
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import ParkingSecuritySystem
+
+#(personas, vehiculos)
+SCENARIOS = [(2, 5), (5, 20), (10, 40), (20, 80), (40, 160)]
+FRAMES = 80
+DT = 0.1  # segundos entre frames
+
+
+def make_scene(n_persons, n_vehicles, rng):
+    #vehiculos estaticos en rejilla, personas caminando al azar
+    cols = max(int(np.ceil(np.sqrt(n_vehicles))), 1)
+    vehicles = []
+    for k in range(n_vehicles):
+        x = 60 + (k % cols) * 180
+        y = 60 + (k // cols) * 120
+        vehicles.append((1000 + k, np.array([x, y, x + 140, y + 80], dtype=np.float32)))
+
+    start = rng.uniform(0, cols * 180, size=(n_persons, 2)).astype(np.float32)
+    steps = rng.normal(0, 4, size=(FRAMES, n_persons, 2)).astype(np.float32)
+    paths = start + np.cumsum(steps, axis=0)
+
+    frames = []
+    for f in range(FRAMES):
+        persons = []
+        for p in range(n_persons):
+            x, y = paths[f, p]
+            persons.append((p + 1, np.array([x, y, x + 40, y + 100], dtype=np.float32)))
+        frames.append(persons)
+    return frames, vehicles
+
+
+def run(system, frames, vehicles):
+    alerts = []
+    elapsed = 0.0
+    for f, persons in enumerate(frames):
+        t0 = time.perf_counter()
+        suspicious = system.detect_suspicious_activity(persons, vehicles, f * DT)
+        elapsed += time.perf_counter() - t0
+        for ev in suspicious:
+            alerts.append((f, ev["pair_key"], float(ev["duration"]), float(ev["iou"])))
+    return alerts, elapsed / len(frames)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    loop_system = ParkingSecuritySystem(model_path="yolov8n.yaml", vectorized_proximity=False)
+    fast_system = ParkingSecuritySystem(model_path="yolov8n.yaml", vectorized_proximity=True)
+    for system in (loop_system, fast_system):
+        system.loitering_time_threshold = 2
+
+    print(f"{'parejas':>8} {'bucle ms':>10} {'numpy ms':>10} {'speedup':>8} {'alertas':>8}")
+    for n_persons, n_vehicles in SCENARIOS:
+        frames, vehicles = make_scene(n_persons, n_vehicles, rng)
+        for system in (loop_system, fast_system):
+            system.pair_state.clear()
+
+        loop_alerts, loop_t = run(loop_system, frames, vehicles)
+        fast_alerts, fast_t = run(fast_system, frames, vehicles)
+        #mismas alertas (frame y pareja); duración e IoU con tolerancia de punto flotante
+        same = [a[:2] for a in loop_alerts] == [a[:2] for a in fast_alerts] and np.allclose(
+            np.array([a[2:] for a in loop_alerts]).reshape(-1, 2),
+            np.array([a[2:] for a in fast_alerts]).reshape(-1, 2),
+        )
+        if not same:
+            raise SystemExit(f"resultados distintos con {n_persons}x{n_vehicles}")
+
+        print(
+            f"{n_persons * n_vehicles:>8} {loop_t * 1000:>10.3f} {fast_t * 1000:>10.3f} "
+            f"{loop_t / fast_t:>7.1f}x {len(fast_alerts):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
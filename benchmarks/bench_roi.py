@@ -0,0 +1,103 @@
+# bench_roi.py
+# Unión de detecciones en las costuras de los tiles de zonas (roi.RegionTiler): una persona cortada por
+# la costura o vista por dos tiles queda como una sola caja, y las cajas que se tapan dentro de un
+# mismo tile (niño delante de un adulto, autos pegados o tapados) no se unen. También mide el costo
+# de assemble. No necesita red ni pesos de YOLO (detector falso que recorta las cajas a cada tile).
+#   python benchmarks/bench_roi.py
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from roi import RegionTiler
+from synthetic import NAMES
+
+#frame de 1216x640 con tiles de 640 y 64 px de solapamiento: (0, 0, 640, 640) y (576, 0, 1216, 640)
+WIDTH, HEIGHT = 1216, 640
+PERSON, CAR = 0, 2
+
+#(nombre, [(x1, y1, x2, y2, confianza, clase)], cajas esperadas después de unir)
+CASES = [
+    ("persona cruzando la costura", [(600, 200, 660, 380, 0.9, PERSON)], [(600, 200, 660, 380)]),
+    ("persona ancha cortada por los dos tiles", [(540, 200, 680, 380, 0.9, PERSON)], [(540, 200, 680, 380)]),
+    (
+        "niño delante de un adulto",
+        [(200, 100, 280, 400, 0.9, PERSON), (215, 250, 265, 400, 0.8, PERSON)],
+        [(200, 100, 280, 400), (215, 250, 265, 400)],
+    ),
+    (
+        "niño delante de un adulto en la banda compartida",
+        [(580, 100, 636, 400, 0.9, PERSON), (590, 250, 630, 400, 0.8, PERSON)],
+        [(580, 100, 636, 400), (590, 250, 630, 400)],
+    ),
+    (
+        "niño entero delante de un adulto cortado",
+        [(560, 100, 660, 400, 0.9, PERSON), (600, 250, 636, 400, 0.8, PERSON)],
+        [(560, 100, 660, 400), (600, 250, 636, 400)],
+    ),
+    (
+        "autos uno detrás de otro",
+        [(800, 100, 860, 210, 0.9, CAR), (800, 205, 860, 315, 0.85, CAR)],
+        [(800, 100, 860, 210), (800, 205, 860, 315)],
+    ),
+    (
+        "auto tapado en parte por otro",
+        [(900, 100, 960, 210, 0.9, CAR), (910, 110, 970, 220, 0.7, CAR)],
+        [(900, 100, 960, 210), (910, 110, 970, 220)],
+    ),
+    ("auto dentro de la banda compartida", [(582, 300, 634, 420, 0.9, CAR)], [(582, 300, 634, 420)]),
+]
+
+
+#lo que vería el detector en cada tile: la parte visible de cada caja (si queda al menos un 30%)
+def tile_results(tiler, frame, boxes):
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+    results = []
+    for x0, y0, x1, y1 in tiler.tiles(frame.shape):
+        clipped = boxes.copy()
+        clipped[:, [0, 2]] = np.clip(clipped[:, [0, 2]], x0, x1) - x0
+        clipped[:, [1, 3]] = np.clip(clipped[:, [1, 3]], y0, y1) - y0
+        visible = (clipped[:, 2] - clipped[:, 0]) * (clipped[:, 3] - clipped[:, 1])
+        area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        clipped = clipped[visible >= 0.3 * area]
+        results.append(Results(frame[y0:y1, x0:x1], "bench", NAMES, boxes=torch.as_tensor(clipped)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unión de detecciones en las costuras de los tiles")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    frame = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    tiler = RegionTiler([[[0, 0], [1, 0], [1, 1], [0, 1]]], tile_size=640, overlap=64)
+
+    failed = 0
+    print(f"{'caso':<50} {'cajas':>6} {'esperadas':>10} {'ok':>4}")
+    for name, boxes, expected in CASES:
+        merged = tiler.assemble(frame, tile_results(tiler, frame, boxes)).boxes.xyxy.numpy()
+        got = sorted(tuple(np.round(box).astype(int).tolist()) for box in merged)
+        ok = got == sorted(expected)
+        failed += not ok
+        print(f"{name:<50} {len(got):>6} {len(expected):>10} {'sí' if ok else 'no':>4}")
+        if not ok:
+            print(f"    obtenidas {got}")
+
+    #todas las cajas de los casos juntas en un frame
+    results = tile_results(tiler, frame, [box for _, boxes, _ in CASES for box in boxes])
+    t0 = time.perf_counter()
+    for _ in range(args.repeats):
+        tiler.assemble(frame, results)
+    print(f"assemble: {(time.perf_counter() - t0) / args.repeats * 1000:.3f} ms por frame")
+
+    if failed:
+        raise SystemExit(f"{failed} casos no coinciden")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# bench_scenes.py
+# Escenas sintéticas de estacionamiento de punta a punta: rendimiento, memoria y alertas contra el guion.
+# No necesita red ni pesos de YOLO (detector falso con las cajas del guion).
+#   python benchmarks/bench_scenes.py
+#   python benchmarks/bench_scenes.py --level proximity --scenario grande
+#   python benchmarks/bench_scenes.py --stride 3 --json resultados/bench.json
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import ParkingSecuritySystem
+from proximity import iou_matrix
+from synthetic import ParkingScene, StubDetector
+
+#nombre -> (vehiculos, personas)
+SCENARIOS = {
+    "chico": (8, 4),
+    "mediano": (48, 16),
+    "grande": (144, 48),
+}
+#margen (s) entre la alerta esperada y la observada
+TIME_TOLERANCE = 0.5
+
+
+def make_system(scene, options):
+    return ParkingSecuritySystem(
+        model=StubDetector(scene),
+        loitering_time_threshold=scene.threshold,
+        max_events=None,
+        **options,
+    )
+
+
+#ids del tracker -> ids del guion, por IoU con las cajas del guion en ese frame
+def script_ids(scene, frame_index, tracks, min_iou=0.5):
+    mapping = {}
+    truth_persons, truth_vehicles = scene.tracks(frame_index)
+    for (ids, boxes), truth in zip(tracks, (truth_persons, truth_vehicles)):
+        if not len(ids) or not truth:
+            continue
+        #emparejamiento uno a uno (dos personas pueden estar en el mismo lugar)
+        iou = iou_matrix(boxes, np.stack([b for _, b in truth]))
+        while iou.size and iou.max() >= min_iou:
+            row, col = np.unravel_index(iou.argmax(), iou.shape)
+            mapping[int(ids[row])] = truth[col][0]
+            iou[row, :] = 0
+            iou[:, col] = 0
+    return mapping
+
+
+#una pasada por la escena; devuelve (latencias por frame, alertas {(persona, vehiculo): tiempo})
+def run_scene(scene, level, options):
+    system = make_system(scene, options)
+    latencies = np.zeros(scene.n_frames)
+    alerts = {}
+
+    for f in range(scene.n_frames):
+        current_time = scene.time(f)
+        if level == "frame":
+            frame = scene.render(f)
+            t0 = time.perf_counter()
+            _, alert_count = system.process_frame(frame, current_time)
+            latencies[f] = time.perf_counter() - t0
+            if alert_count:
+                mapping = script_ids(scene, f, system.last_tracks)
+                for ev in system.suspicious_events.recent(alert_count):
+                    person_id, vehicle_id = (int(v) for v in ev["pair_key"].split("-"))
+                    key = (mapping.get(person_id, -person_id), mapping.get(vehicle_id, -vehicle_id))
+                    alerts.setdefault(key, ev["video_time"])
+        else:
+            persons, vehicles = scene.tracks(f)
+            t0 = time.perf_counter()
+            suspicious = system.detect_suspicious_activity(persons, vehicles, current_time)
+            latencies[f] = time.perf_counter() - t0
+            for ev in suspicious:
+                person_id, vehicle_id = (int(v) for v in ev["pair_key"].split("-"))
+                alerts.setdefault((person_id, vehicle_id), current_time)
+
+    return latencies, alerts, system
+
+
+def check_alerts(expected, observed):
+    hits = [key for key in observed if key in expected]
+    errors = [abs(observed[key] - expected[key]) for key in hits]
+    return {
+        "expected": len(expected),
+        "observed": len(observed),
+        "missed": sorted(str(k) for k in expected if k not in observed),
+        "unexpected": sorted(str(k) for k in observed if k not in expected),
+        "max_time_error": max(errors) if errors else 0.0,
+    }
+
+
+def peak_memory(scene, level, options):
+    tracemalloc.start()
+    try:
+        run_scene(scene, level, options)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark(name, level, options, duration, seed, memory=True):
+    n_vehicles, n_persons = SCENARIOS[name]
+    scene = ParkingScene(n_vehicles, n_persons, duration=duration, seed=seed)
+
+    latencies, alerts, system = run_scene(scene, level, options)
+    check = check_alerts(scene.expected_alerts(), alerts)
+    ms = latencies * 1000
+    result = {
+        "scenario": name,
+        "level": level,
+        "vehicles": n_vehicles,
+        "persons": n_persons,
+        "frames": scene.n_frames,
+        "fps": scene.n_frames / latencies.sum(),
+        "latency_ms": {
+            "mean": float(ms.mean()),
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)),
+        },
+        "peak_memory_mb": peak_memory(scene, level, options) / 2**20 if memory else None,
+        "alerts": check,
+        "state": system.state_metrics(),
+    }
+    result["ok"] = (
+        not check["missed"] and not check["unexpected"] and check["max_time_error"] <= TIME_TOLERANCE
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark con escenas sintéticas")
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--level", choices=["frame", "proximity"], default="frame",
+                        help="frame: process_frame completo; proximity: solo detect_suspicious_activity")
+    parser.add_argument("--duration", type=float, default=60.0, help="segundos de escena (10 fps)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="omitir la pasada con tracemalloc")
+    parser.add_argument("--json", default=None, help="guardar los resultados")
+    #opciones del sistema para comparar optimizaciones sobre las mismas escenas
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--motion-gate", choices=["mog2", "diff"], default=None)
+    parser.add_argument("--spatial-index", action="store_true")
+    parser.add_argument("--loop-proximity", action="store_true", help="bucle por parejas original")
+    args = parser.parse_args()
+
+    options = dict(
+        stride=args.stride,
+        batch_size=args.batch_size,
+        motion_gate=args.motion_gate,
+        spatial_index=args.spatial_index,
+        vectorized_proximity=not args.loop_proximity,
+    )
+
+    print(f"{'escenario':>10} {'frames':>7} {'FPS':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'mem MB':>7} {'alertas':>9} {'err s':>6}  ok")
+    results = []
+    for name in args.scenario:
+        result = benchmark(name, args.level, options, args.duration, args.seed, memory=not args.no_memory)
+        results.append(result)
+        latency = result["latency_ms"]
+        alerts = result["alerts"]
+        memory = f"{result['peak_memory_mb']:.1f}" if result["peak_memory_mb"] is not None else "-"
+        print(
+            f"{name:>10} {result['frames']:>7} {result['fps']:>8.1f} {latency['p50']:>8.2f} "
+            f"{latency['p95']:>8.2f} {latency['p99']:>8.2f} {memory:>7} "
+            f"{alerts['observed']:>4}/{alerts['expected']:<4} {alerts['max_time_error']:>6.2f}  "
+            f"{'sí' if result['ok'] else 'NO'}"
+        )
+        for key in ("missed", "unexpected"):
+            if alerts[key]:
+                print(f"{'':>10} {key}: {', '.join(alerts[key])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": options, "level": args.level, "results": results}, f, indent=2)
+
+    if not all(r["ok"] for r in results):
+        raise SystemExit("las alertas no coinciden con el guion")
+
+
+if __name__ == "__main__":
+    main()
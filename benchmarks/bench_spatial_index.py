@@ -0,0 +1,61 @@
+# bench_spatial_index.py
+# Bucle por parejas vs matrices numpy vs rejilla espacial de vehículos.
+#   python benchmarks/bench_spatial_index.py
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_proximity import make_scene, run
+from core import ParkingSecuritySystem
+
+#(personas, vehiculos)
+SCENARIOS = [(5, 10), (10, 40), (10, 100), (20, 200), (20, 400), (50, 400), (50, 1000)]
+MODES = {
+    "bucle": dict(vectorized_proximity=False),
+    "numpy": dict(vectorized_proximity=True),
+    "rejilla": dict(spatial_index=True),
+}
+
+
+def main():
+    rng = np.random.default_rng(0)
+    systems = {}
+    for name, options in MODES.items():
+        systems[name] = ParkingSecuritySystem(model_path="yolov8n.yaml", **options)
+        systems[name].loitering_time_threshold = 2
+
+    print(f"{'pers x veh':>11} " + " ".join(f"{name + ' ms':>11}" for name in MODES) + f" {'alertas':>8}")
+    crossover = {}
+    for n_persons, n_vehicles in SCENARIOS:
+        frames, vehicles = make_scene(n_persons, n_vehicles, rng)
+
+        timings = {}
+        alerts = {}
+        for name, system in systems.items():
+            system.pair_state.clear()
+            system.vehicle_grid.clear()
+            alerts[name], timings[name] = run(system, frames, vehicles)
+
+        if any(a != alerts["bucle"] for a in alerts.values()):
+            raise SystemExit(f"resultados distintos con {n_persons}x{n_vehicles}")
+
+        for other in ("bucle", "numpy"):
+            if other not in crossover and timings["rejilla"] < timings[other]:
+                crossover[other] = n_persons * n_vehicles
+
+        print(
+            f"{n_persons:>4} x {n_vehicles:<4} "
+            + " ".join(f"{timings[name] * 1000:>11.3f}" for name in MODES)
+            + f" {len(alerts['bucle']):>8}"
+        )
+
+    for other in ("bucle", "numpy"):
+        where = crossover.get(other)
+        text = f"desde {where} parejas" if where else "en ningún escenario"
+        print(f"La rejilla supera a '{other}' {text}")
+
+
+if __name__ == "__main__":
+    main()
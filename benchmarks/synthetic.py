@@ -0,0 +1,224 @@
+# synthetic.py
+# Estacionamiento sintético: autos en filas, personas con recorridos guionados y un detector falso
+# que devuelve esas cajas. No necesita red ni pesos de YOLO.
+import itertools
+import math
+
+import cv2
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+NAMES = {0: "person", 2: "car", 3: "motorcycle", 5: "bus", 7: "truck"}
+
+#geometría (px): autos verticales en filas separadas por pasillos
+CAR_W, CAR_H = 60, 110
+CAR_PITCH = 80
+AISLE = 220
+PERSON_W, PERSON_H = 36, 90
+#cuánto se mete la persona sobre el extremo del auto cuando se detiene junto a él
+OVERLAP = 30
+#solapamiento a partir del cual el sistema la considera cerca (IoU > 0.02)
+TOUCH = 6
+SPEED = 60.0  # px/s
+
+#tipos de recorrido
+LOITER = "loiter"  # se queda junto a un auto más que el umbral -> alerta
+BRIEF = "brief"  # se detiene menos que el umbral -> sin alerta
+PASS = "pass"  # cruza el pasillo -> sin alerta
+
+
+def _person_box(x, y):
+    return np.array([x - PERSON_W / 2, y - PERSON_H / 2, x + PERSON_W / 2, y + PERSON_H / 2], dtype=np.float32)
+
+
+class Walk:
+    #recorrido por tramos rectos: [(t, x, y)], visible solo entre el primer y el último punto
+
+    def __init__(self, person_id, kind, waypoints, vehicle_id=None, touch_time=None):
+        self.person_id = person_id
+        self.kind = kind
+        self.waypoints = np.asarray(waypoints, dtype=np.float64)
+        self.vehicle_id = vehicle_id
+        #momento en que empieza a estar cerca del auto
+        self.touch_time = touch_time
+
+    def position(self, t):
+        times = self.waypoints[:, 0]
+        if t < times[0] or t > times[-1]:
+            return None
+        x = np.interp(t, times, self.waypoints[:, 1])
+        y = np.interp(t, times, self.waypoints[:, 2])
+        return x, y
+
+
+class ParkingScene:
+    #n_vehicles autos estacionados y n_persons personas; todo se deriva de `seed`
+
+    def __init__(self, n_vehicles, n_persons, duration=60.0, fps=10, threshold=5.0, seed=0,
+                 loiter_fraction=0.4, brief_fraction=0.2):
+        self.fps = fps
+        self.dt = 1.0 / fps
+        self.n_frames = int(duration * fps)
+        self.threshold = threshold
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+
+        self.per_row = min(max(n_vehicles, 1), 24)
+        self.rows = math.ceil(n_vehicles / self.per_row)
+        self.width = self.per_row * CAR_PITCH + CAR_PITCH
+        self.height = self.rows * (CAR_H + AISLE) + AISLE
+
+        #fila r ocupa y en [top, top + CAR_H]; el pasillo r va debajo de ella
+        self.vehicles = []
+        for k in range(n_vehicles):
+            row, col = divmod(k, self.per_row)
+            x = CAR_PITCH / 2 + col * CAR_PITCH + (CAR_PITCH - CAR_W) / 2
+            y = AISLE + row * (CAR_H + AISLE)
+            self.vehicles.append((1000 + k, np.array([x, y, x + CAR_W, y + CAR_H], dtype=np.float32)))
+
+        kinds = rng.choice(
+            [LOITER, BRIEF, PASS], size=n_persons,
+            p=[loiter_fraction, brief_fraction, 1 - loiter_fraction - brief_fraction],
+        )
+        #cada persona que se detiene lo hace junto a un auto distinto (si alcanzan)
+        self._targets = itertools.cycle(rng.permutation(max(n_vehicles, 1)).tolist())
+        self.walks = [self._make_walk(p + 1, kind, rng, duration) for p, kind in enumerate(kinds)]
+
+        self._background = None
+
+    def _make_walk(self, person_id, kind, rng, duration):
+        start = rng.uniform(0, duration * 0.3)
+        if kind == PASS or not self.vehicles:
+            #pasillo al azar, de izquierda a derecha
+            aisle = rng.integers(0, self.rows + 1)
+            y = self._aisle_center(aisle)
+            end = start + self.width / SPEED
+            return Walk(person_id, PASS, [(start, 0, y), (end, self.width, y)])
+
+        k = next(self._targets)
+        vehicle_id, box = self.vehicles[k]
+        #pasillo de arriba o de abajo del auto
+        above = bool(rng.integers(2))
+        row = k // self.per_row
+        if above:
+            aisle_y = self._aisle_center(row)
+            stop_y = box[1] - PERSON_H / 2 + OVERLAP
+        else:
+            aisle_y = self._aisle_center(row + 1)
+            stop_y = box[3] + PERSON_H / 2 - OVERLAP
+        x = float(box[0] + box[2]) / 2
+
+        if kind == LOITER:
+            dwell = self.threshold + rng.uniform(2.0, 6.0)
+        else:
+            dwell = rng.uniform(0.5, max(self.threshold - 2.0, 0.6))
+
+        t = start
+        points = [(t, 0, aisle_y)]
+        t += x / SPEED
+        points.append((t, x, aisle_y))
+        t += abs(stop_y - aisle_y) / SPEED
+        arrive = t
+        points.append((t, x, stop_y))
+        t += dwell
+        points.append((t, x, stop_y))
+        t += abs(stop_y - aisle_y) / SPEED
+        points.append((t, x, aisle_y))
+        t += (self.width - x) / SPEED
+        points.append((t, self.width, aisle_y))
+
+        touch_time = arrive - (OVERLAP - TOUCH) / SPEED
+        return Walk(person_id, kind, points, vehicle_id=vehicle_id, touch_time=touch_time)
+
+    def _aisle_center(self, aisle):
+        #pasillo 0 arriba de la primera fila, pasillo i debajo de la fila i-1
+        return aisle * (CAR_H + AISLE) + AISLE / 2
+
+    def time(self, frame_index):
+        return frame_index * self.dt
+
+    #(personas, vehiculos) visibles en el frame, con los ids del guion
+    def tracks(self, frame_index):
+        t = self.time(frame_index)
+        persons = []
+        for walk in self.walks:
+            position = walk.position(t)
+            if position is not None:
+                persons.append((walk.person_id, _person_box(*position)))
+        return persons, self.vehicles
+
+    #alertas esperadas: {(persona, vehiculo): tiempo esperado de la alerta}
+    def expected_alerts(self):
+        last_time = self.time(self.n_frames - 1)
+        expected = {}
+        for walk in self.walks:
+            if walk.kind != LOITER:
+                continue
+            alert_time = walk.touch_time + self.threshold
+            if alert_time <= last_time:
+                expected[(walk.person_id, walk.vehicle_id)] = alert_time
+        return expected
+
+    def render(self, frame_index):
+        if self._background is None:
+            self._background = np.full((self.height, self.width, 3), 90, dtype=np.uint8)
+            for _, box in self.vehicles:
+                x1, y1, x2, y2 = box.astype(int)
+                cv2.rectangle(self._background, (x1, y1), (x2, y2), (40, 40, 160), -1)
+
+        frame = self._background.copy()
+        persons, _ = self.tracks(frame_index)
+        for _, box in persons:
+            x1, y1, x2, y2 = box.astype(int)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (200, 200, 60), -1)
+        stamp_frame(frame, frame_index)
+        return frame
+
+
+#el índice del frame va en el primer pixel (24 bits) para que el detector sepa qué frame recibe
+def stamp_frame(frame, frame_index):
+    frame[0, 0] = (frame_index & 255, (frame_index >> 8) & 255, (frame_index >> 16) & 255)
+
+
+def read_stamp(frame):
+    b, g, r = (int(v) for v in frame[0, 0])
+    return b | (g << 8) | (r << 16)
+
+
+class StubDetector:
+    #sustituto de YOLO: devuelve las cajas del guion con algo de ruido (determinista por frame)
+
+    def __init__(self, scene, jitter=1.5, miss_rate=0.0, confidence=0.9):
+        self.scene = scene
+        self.jitter = jitter
+        self.miss_rate = miss_rate
+        self.confidence = confidence
+        self.names = NAMES
+        self.calls = 0
+
+    def detections(self, frame_index):
+        persons, vehicles = self.scene.tracks(frame_index)
+        boxes = [box for _, box in persons] + [box for _, box in vehicles]
+        classes = [0] * len(persons) + [2] * len(vehicles)
+        if not boxes:
+            return np.zeros((0, 6), dtype=np.float32)
+
+        rng = np.random.default_rng((self.scene.seed, frame_index))
+        data = np.zeros((len(boxes), 6), dtype=np.float32)
+        data[:, :4] = np.stack(boxes) + rng.normal(0, self.jitter, size=(len(boxes), 4))
+        data[:, 4] = self.confidence
+        data[:, 5] = classes
+        if self.miss_rate:
+            data = data[rng.random(len(data)) >= self.miss_rate]
+        return data
+
+    def predict(self, images, **kwargs):
+        if isinstance(images, np.ndarray):
+            images = [images]
+        results = []
+        for image in images:
+            self.calls += 1
+            data = self.detections(read_stamp(image))
+            results.append(Results(image, "synthetic", self.names, boxes=torch.as_tensor(data)))
+        return results
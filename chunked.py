@@ -0,0 +1,285 @@
+# chunked.py
+# Un video largo dividido en tramos con solapamiento, cada tramo en su propio proceso.
+import itertools
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+from ultralytics.utils import YAML
+from ultralytics.utils.checks import check_yaml
+
+from clock import VideoClock
+from core import session_system
+from pipeline import STAGES, run_sequential
+from proximity import bbox_iou
+from report import build_report, write_report
+
+
+#solapamiento mínimo: el calentamiento tiene que reconstruir el merodeo (loitering_time_threshold) y
+#dejar frames compartidos con el tramo anterior después de que expiren sus tracks perdidos
+#(track_buffer del tracker, en frames a 30 FPS); con menos, las alertas cerca del corte cambian
+def min_overlap_seconds(loitering_time_threshold=5, tracker_config="bytetrack.yaml"):
+    return loitering_time_threshold + YAML.load(check_yaml(tracker_config))["track_buffer"] / 30
+
+
+#tramos [start, end) con `overlap` frames previos de calentamiento (read_start)
+def plan_chunks(total_frames, n_chunks, overlap):
+    n_chunks = max(1, min(n_chunks, total_frames))
+    size = math.ceil(total_frames / n_chunks)
+
+    chunks = []
+    for index, start in enumerate(range(0, total_frames, size)):
+        chunks.append({
+            "index": index,
+            "read_start": max(start - overlap, 0),
+            "start": start,
+            "end": min(start + size, total_frames),
+        })
+
+    #frames del final de cada tramo que el siguiente también procesa
+    for chunk, following in zip(chunks, chunks[1:]):
+        chunk["tail_start"] = following["read_start"]
+    chunks[-1]["tail_start"] = chunks[-1]["end"]
+    return chunks
+
+
+def _serialize_tracks(tracks):
+    (person_ids, person_boxes), (vehicle_ids, vehicle_boxes) = tracks
+    return (
+        [(track_id, "person", box) for track_id, box in zip(person_ids.tolist(), person_boxes.tolist())]
+        + [(track_id, "vehicle", box) for track_id, box in zip(vehicle_ids.tolist(), vehicle_boxes.tolist())]
+    )
+
+
+def process_chunk(video_path, chunk, segment_path, system_options):
+    #un tramo es finito: se guardan todos sus eventos para unirlos después
+    #sin segmento de video no se dibuja; el modelo se reutiliza entre los tramos de un mismo proceso
+    system = session_system(
+        max_events=None, annotate=segment_path is not None, draw_in_place=True, **system_options
+    )
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"No se pudo abrir el video: {video_path}")
+    cap.set(cv2.CAP_PROP_POS_FRAMES, chunk["read_start"])
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+
+    out = None
+    if segment_path:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        out = cv2.VideoWriter(segment_path, fourcc, fps, (width, height))
+
+    head = {}
+    tail = {}
+
+    def on_frame(index, processed_frame, alert_count, tracks):
+        if index < chunk["start"]:
+            head[index] = _serialize_tracks(tracks)
+            return
+        if index >= chunk["tail_start"]:
+            tail[index] = _serialize_tracks(tracks)
+        if out is not None:
+            out.write(processed_frame)
+
+    try:
+        frame_count, stage_times = run_sequential(
+            system,
+            cap,
+            VideoClock(cap, fps=fps, start_frame=chunk["read_start"]),
+            max_frames=chunk["end"] - chunk["read_start"],
+            on_frame=on_frame,
+        )
+    finally:
+        cap.release()
+        if out is not None:
+            out.release()
+
+    #las alertas del calentamiento pertenecen al tramo anterior
+    events = [
+        ev for ev in system.suspicious_events
+        if round(ev["video_time"] * fps) >= chunk["start"]
+    ]
+    return {
+        "chunk": chunk,
+        "fps": fps,
+        "frames": frame_count - (chunk["start"] - chunk["read_start"]),
+        "stage_times": stage_times,
+        "events": events,
+        "head": head,
+        "tail": tail,
+        "segment_path": segment_path,
+    }
+
+
+#ids locales de cada tramo -> ids globales, emparejando tracks en los frames solapados
+def reconcile_tracks(chunk_results, min_iou=0.5):
+    mapping = {}
+    counter = itertools.count(1)
+
+    def global_id(chunk_index, track_id):
+        key = (chunk_index, track_id)
+        if key not in mapping:
+            mapping[key] = next(counter)
+        return mapping[key]
+
+    for k in range(1, len(chunk_results)):
+        previous = chunk_results[k - 1]
+        current = chunk_results[k]
+
+        votes = Counter()
+        for index, tracks in current["head"].items():
+            previous_tracks = previous["tail"].get(index, [])
+            for track_id, kind, box in tracks:
+                for previous_id, previous_kind, previous_box in previous_tracks:
+                    if kind == previous_kind and bbox_iou(box, previous_box) >= min_iou:
+                        votes[(previous_id, track_id)] += 1
+
+        used_previous = set()
+        used_current = set()
+        for (previous_id, track_id), _ in votes.most_common():
+            if previous_id in used_previous or track_id in used_current:
+                continue
+            used_previous.add(previous_id)
+            used_current.add(track_id)
+            mapping[(k, track_id)] = global_id(k - 1, previous_id)
+
+    return global_id
+
+
+#eventos con ids globales, sin repetir un merodeo que continúa desde el tramo anterior
+def merge_events(chunk_results, global_id):
+    merged = []
+    alerted = set()
+
+    for k, result in enumerate(chunk_results):
+        chunk_start_time = result["chunk"]["read_start"] / result["fps"]
+        alerted_here = set()
+
+        for ev in result["events"]:
+            person_id, vehicle_id = (int(v) for v in ev["pair_key"].split("-"))
+            pair_key = f"{global_id(k, person_id)}-{global_id(k, vehicle_id)}"
+
+            alerted_here.add(pair_key)
+
+            #el tramo empezó con la pareja ya cerca: es la misma alerta del tramo anterior
+            episode_start = ev["video_time"] - ev["duration"]
+            if pair_key in alerted and episode_start <= chunk_start_time + 1e-6:
+                continue
+
+            merged.append(dict(ev, pair_key=pair_key, chunk=k))
+
+        alerted = alerted_here
+
+    merged.sort(key=lambda ev: ev["video_time"])
+    return merged
+
+
+def concat_segments(segment_paths, output_path, fps, size):
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            for path in segment_paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+            list_path = f.name
+        try:
+            subprocess.run(
+                [ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                 "-i", list_path, "-c", "copy", output_path],
+                check=True,
+            )
+            return
+        except subprocess.CalledProcessError:
+            pass
+        finally:
+            os.remove(list_path)
+
+    #sin ffmpeg: se vuelven a codificar los segmentos uno tras otro
+    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    try:
+        for path in segment_paths:
+            cap = cv2.VideoCapture(path)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                out.write(frame)
+            cap.release()
+    finally:
+        out.release()
+
+
+def process_video_chunked(
+    video_path,
+    output_dir,
+    chunks=4,
+    workers=4,
+    overlap_seconds=10.0,
+    write_video=True,
+    name=None,
+    **system_options,
+):
+    minimum = min_overlap_seconds(system_options.get("loitering_time_threshold", 5))
+    if overlap_seconds < minimum:
+        raise ValueError(f"el solapamiento entre tramos debe ser de al menos {minimum:.1f}s (se pidió {overlap_seconds}s)")
+
+    #name: prefijo de las salidas (por defecto el nombre del video, ver cli.output_names)
+    name = name or os.path.splitext(os.path.basename(video_path))[0]
+    output_video_path = os.path.join(output_dir, f"{name}_detection.mp4")
+    report_path = os.path.join(output_dir, f"{name}_report.json")
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"No se pudo abrir el video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+    if total_frames <= 0:
+        raise RuntimeError(f"No se conoce el número de frames de {video_path}")
+
+    plan = plan_chunks(total_frames, chunks, int(overlap_seconds * fps))
+    start_time = time.time()
+
+    with tempfile.TemporaryDirectory(dir=output_dir) as segment_dir:
+        with ProcessPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures = []
+            for chunk in plan:
+                segment_path = None
+                if write_video:
+                    segment_path = os.path.join(segment_dir, f"{name}_{chunk['index']:04d}.mp4")
+                futures.append(pool.submit(process_chunk, video_path, chunk, segment_path, system_options))
+            chunk_results = [future.result() for future in futures]
+
+        if write_video:
+            concat_segments([r["segment_path"] for r in chunk_results], output_video_path, fps, size)
+
+    events = merge_events(chunk_results, reconcile_tracks(chunk_results))
+    elapsed_time = time.time() - start_time
+
+    stats = {
+        "total_frames": sum(r["frames"] for r in chunk_results),
+        "processing_time": elapsed_time,
+        "total_alerts": len(events),
+        "output_path": output_video_path if write_video else None,
+        "stage_times": {s: sum(r["stage_times"][s] for r in chunk_results) for s in STAGES},
+        "chunks": len(plan),
+    }
+    configuration = {
+        "confidence_threshold": system_options.get("confidence", 0.5),
+        "proximity_threshold": system_options.get("proximity_threshold", 100),
+        "loitering_time_threshold": system_options.get("loitering_time_threshold", 5),
+        "chunk_overlap_seconds": overlap_seconds,
+    }
+    write_report(report_path, build_report(None, stats, events=events, configuration=configuration))
+
+    stats["video_path"] = video_path
+    stats["report_path"] = report_path
+    return stats
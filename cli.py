@@ -0,0 +1,335 @@
+# cli.py
+# Procesamiento por lotes sin interfaz grafica:
+#   python cli.py videos/ "grabaciones/*.mp4" -o resultados -w 4
+import argparse
+import glob
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from backends import add_backend_arguments, check_backend_arguments, export_model
+from chunked import min_overlap_seconds, process_video_chunked
+from clips import ClipRecorder
+from clock import VideoClock
+from core import session_system
+from events import remove_log
+from pipeline import STAGES, run_sequential
+from report import build_report, write_report
+from roi import load_zones
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+
+
+#directorios, patrones glob o archivos -> lista ordenada de videos
+def collect_videos(inputs):
+    videos = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        elif glob.has_magic(item):
+            candidates = glob.glob(item)
+        else:
+            candidates = [item]
+
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.abspath(path))
+    return sorted(set(videos))
+
+
+#prefijo de las salidas de cada video: el nombre sin extensión; si dos videos se llaman igual
+#(cam1/clip.mp4 y cam2/clip.mp4) se antepone la carpeta, y si aún coinciden, un número
+def output_names(videos):
+    stems = {video: os.path.splitext(os.path.basename(video))[0] for video in videos}
+    repeated = Counter(stems.values())
+    names = {
+        video: stem if repeated[stem] == 1 else f"{os.path.basename(os.path.dirname(video))}_{stem}"
+        for video, stem in stems.items()
+    }
+    counts = Counter(names.values())
+    used = set(names.values())
+    for video in videos:
+        name = names[video]
+        if counts[name] > 1:
+            k = 1
+            while f"{name}_{k}" in used:
+                k += 1
+            names[video] = f"{name}_{k}"
+            used.add(names[video])
+    return names
+
+
+def process_video(
+    video_path,
+    output_dir,
+    model_path="yolov8m.pt",
+    confidence=0.5,
+    write_video=True,
+    batch_size=1,
+    stride=1,
+    motion_threshold=None,
+    motion_gate=None,
+    gate_threshold=None,
+    roi_zones=None,
+    tile_size=640,
+    backend="torch",
+    imgsz=640,
+    precision="fp32",
+    calibration_data=None,
+    profile=False,
+    clips=False,
+    pre_roll=3.0,
+    post_roll=3.0,
+    dwell=False,
+    name=None,
+):
+    #name: prefijo de las salidas (por defecto el nombre del video, ver output_names)
+    name = name or os.path.splitext(os.path.basename(video_path))[0]
+    output_video_path = os.path.join(output_dir, f"{name}_detection.mp4")
+    report_path = os.path.join(output_dir, f"{name}_report.json")
+    events_path = os.path.join(output_dir, f"{name}_events.jsonl")
+    dwell_path = os.path.join(output_dir, f"{name}_dwell.npz") if dwell else None
+    remove_log(events_path)
+
+    #el modelo se carga una vez por proceso; cada video es una sesión nueva (tracker y estado limpios)
+    system = session_system(
+        model_path=model_path,
+        confidence=confidence,
+        batch_size=batch_size,
+        stride=stride,
+        motion_threshold=motion_threshold,
+        motion_gate=motion_gate,
+        gate_threshold=gate_threshold,
+        roi_zones=roi_zones,
+        tile_size=tile_size,
+        backend=backend,
+        imgsz=imgsz,
+        precision=precision,
+        calibration_data=calibration_data,
+        profile=profile,
+        profile_log_interval=10.0 if profile else None,
+        events_path=events_path,
+        history_path=dwell_path,
+        #sin video completo solo se dibujan los frames que terminan en un clip
+        annotate=write_video,
+        draw_in_place=True,
+    )
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"No se pudo abrir el video: {video_path}")
+
+    out = None
+    if write_video:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+
+    recorder = None
+    if clips:
+        recorder = ClipRecorder(
+            os.path.join(output_dir, f"{name}_clips"),
+            name,
+            cap.get(cv2.CAP_PROP_FPS) or 30,
+            pre_roll=pre_roll,
+            post_roll=post_roll,
+            draw=system.annotate,
+        )
+
+    start_time = time.time()
+    try:
+        frame_count, stage_times = run_sequential(system, cap, VideoClock(cap), writer=out, clips=recorder)
+    finally:
+        cap.release()
+        if out is not None:
+            out.release()
+        if recorder is not None:
+            recorder.close()
+        system.close()
+
+    elapsed_time = time.time() - start_time
+    stats = {
+        "total_frames": frame_count,
+        "processing_time": elapsed_time,
+        "total_alerts": system.suspicious_events.total,
+        "output_path": output_video_path if write_video else None,
+        "events_path": events_path,
+        "stage_times": stage_times,
+        "session": system.sessions,
+        "dwell_path": dwell_path,
+    }
+    if recorder is not None:
+        stats["clips"] = recorder.summary()
+    write_report(report_path, build_report(system, stats))
+
+    stats["video_path"] = video_path
+    stats["report_path"] = report_path
+    return stats
+
+
+#(video, estadisticas, error) a medida que termina cada video; `names` = prefijo de salida por video
+def run_videos(videos, workers, options, chunks=1, overlap_seconds=10.0, names=None):
+    names = names or {}
+    if chunks > 1:
+        #un video a la vez, repartiendo sus tramos entre los procesos
+        for video in videos:
+            try:
+                yield video, process_video_chunked(
+                    video, chunks=chunks, workers=workers, overlap_seconds=overlap_seconds,
+                    name=names.get(video), **options
+                ), None
+            except Exception as exc:
+                yield video, None, exc
+        return
+
+    if workers <= 1:
+        for video in videos:
+            try:
+                yield video, process_video(video, name=names.get(video), **options), None
+            except Exception as exc:
+                yield video, None, exc
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_video, video, name=names.get(video), **options): video for video in videos}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as exc:
+                yield futures[future], None, exc
+
+
+def print_summary(results, wall_time):
+    total_frames = sum(r["total_frames"] for r in results)
+    total_alerts = sum(r["total_alerts"] for r in results)
+    stage_totals = {s: sum(r["stage_times"][s] for r in results) for s in STAGES}
+
+    print("\nResumen")
+    print(f"  Videos: {len(results)} | Frames: {total_frames} | Alertas: {total_alerts}")
+    fps = total_frames / wall_time if wall_time > 0 else 0.0
+    print(f"  Tiempo total: {wall_time:.2f}s | FPS agregado: {fps:.2f}")
+    for stage in STAGES:
+        per_frame = stage_totals[stage] / total_frames * 1000 if total_frames else 0.0
+        print(f"  {stage:<10} {stage_totals[stage]:>9.2f}s  {per_frame:>8.2f} ms/frame")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ParkWatch Lite - procesamiento por lotes sin interfaz")
+    parser.add_argument("inputs", nargs="+", help="videos, directorios o patrones glob")
+    parser.add_argument("-o", "--output-dir", default="resultados")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="procesos en paralelo")
+    parser.add_argument("--model", default="yolov8m.pt")
+    add_backend_arguments(parser)
+    parser.add_argument("--confidence", type=float, default=0.5)
+    parser.add_argument("-b", "--batch-size", type=int, default=1, help="frames por pasada del modelo")
+    parser.add_argument("--stride", type=int, default=1, help="inferir cada N frames")
+    parser.add_argument(
+        "--motion-threshold",
+        type=float,
+        default=None,
+        help="fracción de pixeles cambiados que fuerza la inferencia antes del stride",
+    )
+    parser.add_argument(
+        "--motion-gate",
+        choices=["mog2", "diff"],
+        default=None,
+        help="no inferir en frames sin movimiento (fondo MOG2 o diferencia de frames)",
+    )
+    parser.add_argument(
+        "--gate-threshold",
+        type=float,
+        default=None,
+        help="fracción de pixeles en movimiento para abrir la compuerta (0.002 por defecto)",
+    )
+    parser.add_argument("--zones", default=None, help="JSON con los polígonos de las zonas a vigilar")
+    parser.add_argument("--tile-size", type=int, default=640, help="tamaño de los recortes sobre las zonas")
+    parser.add_argument("--chunks", type=int, default=1, help="dividir cada video en N tramos paralelos")
+    parser.add_argument(
+        "--overlap",
+        type=float,
+        default=10.0,
+        help=(
+            "segundos de solapamiento entre tramos (calentamiento del tracker); al menos el umbral de "
+            f"merodeo más el búfer de tracks perdidos ({min_overlap_seconds():.0f}s con la configuración por defecto)"
+        ),
+    )
+    parser.add_argument("--profile", action="store_true", help="tiempos por etapa (p50/p95/p99) en el reporte y en consola")
+    parser.add_argument("--no-video", action="store_true", help="no escribir el video anotado")
+    parser.add_argument("--clips", action="store_true", help="un clip corto por alerta en <video>_clips/")
+    parser.add_argument("--pre-roll", type=float, default=3.0, help="segundos antes de la alerta en cada clip")
+    parser.add_argument("--post-roll", type=float, default=3.0, help="segundos después de la última alerta")
+    parser.add_argument(
+        "--dwell", action="store_true", help="historial de tracks y cercanías en <video>_dwell.npz (ver dwell.py)"
+    )
+    args = parser.parse_args(argv)
+    check_backend_arguments(parser, args)
+    if args.clips and args.chunks > 1:
+        parser.error("--clips no está disponible con --chunks")
+    if args.dwell and args.chunks > 1:
+        parser.error("--dwell no está disponible con --chunks")
+    if args.chunks > 1 and args.overlap < min_overlap_seconds():
+        parser.error(f"--overlap debe ser de al menos {min_overlap_seconds():.1f}s con --chunks")
+
+    videos = collect_videos(args.inputs)
+    if not videos:
+        parser.error("no se encontraron videos")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.backend != "torch":
+        #se exporta antes de repartir el trabajo: los procesos solo leen la caché
+        export_model(args.model, args.backend, args.imgsz, args.precision, calibration_data=args.calibration_data)
+
+    options = dict(
+        output_dir=args.output_dir,
+        model_path=args.model,
+        backend=args.backend,
+        imgsz=args.imgsz,
+        precision=args.precision,
+        calibration_data=args.calibration_data,
+        profile=args.profile,
+        confidence=args.confidence,
+        write_video=not args.no_video,
+        batch_size=args.batch_size,
+        stride=args.stride,
+        motion_threshold=args.motion_threshold,
+        motion_gate=args.motion_gate,
+        gate_threshold=args.gate_threshold,
+        roi_zones=load_zones(args.zones) if args.zones else None,
+        tile_size=args.tile_size,
+    )
+    if args.clips:
+        options.update(clips=True, pre_roll=args.pre_roll, post_roll=args.post_roll)
+    if args.dwell:
+        options.update(dwell=True)
+
+    results = []
+    failed = 0
+    start = time.time()
+
+    names = output_names(videos)
+    for video in videos:
+        if names[video] != os.path.splitext(os.path.basename(video))[0]:
+            print(f"[aviso] nombre repetido: las salidas de {video} usan el prefijo {names[video]}")
+
+    runs = run_videos(
+        videos, args.workers, options, chunks=args.chunks, overlap_seconds=args.overlap, names=names
+    )
+    for video, stats, exc in runs:
+        if exc is not None:
+            failed += 1
+            print(f"[error] {video}: {exc}")
+            continue
+        results.append(stats)
+        print(f"[ok] {video}: {stats['total_frames']} frames, {stats['total_alerts']} alertas")
+
+    print_summary(results, time.time() - start)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
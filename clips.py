@@ -0,0 +1,94 @@
+# clips.py
+# Clips cortos por alerta en vez del video anotado completo: los últimos frames esperan en un búfer
+# circular y solo se anotan y codifican los que terminan en un clip (pre-roll + alerta + post-roll).
+import os
+from collections import deque
+
+import cv2
+
+
+class ClipRecorder:
+    #add() por cada frame procesado; una alerta abre un clip con los `pre_roll` s anteriores y lo
+    #mantiene abierto hasta `post_roll` s después de la última alerta (alertas cercanas comparten clip)
+    #draw(frame, overlay) anota el frame al escribirlo; sin draw se escribe tal cual
+
+    def __init__(self, output_dir, prefix, fps, pre_roll=3.0, post_roll=3.0, draw=None, fourcc="mp4v"):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.fps = fps
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+        self.draw = draw
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+
+        #(frame, tiempo de video, overlay) de los últimos pre_roll segundos
+        self.ring = deque(maxlen=max(int(round(pre_roll * fps)), 0))
+        self.clips = []
+        self.frames_written = 0
+        self._writer = None
+        self._clip = None
+
+    def add(self, frame, video_time, alert_count=0, overlay=None):
+        if self._clip is None:
+            if not alert_count:
+                if self.ring.maxlen:
+                    self.ring.append((frame, video_time, overlay))
+                return
+            self._open(video_time)
+
+        self._write(frame, video_time, overlay)
+        if alert_count:
+            self._clip["alerts"] += alert_count
+            self._clip["last_alert"] = video_time
+        elif video_time - self._clip["last_alert"] >= self.post_roll:
+            self._finish()
+
+    def _open(self, video_time):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{self.prefix}_clip{len(self.clips) + 1:03d}_{video_time:.1f}s.mp4")
+        self._clip = {
+            "path": path,
+            "start_time": None,
+            "end_time": None,
+            "first_alert": video_time,
+            "last_alert": video_time,
+            "alerts": 0,
+            "frames": 0,
+        }
+        self.clips.append(self._clip)
+        #pre-roll: lo que estaba en el búfer
+        while self.ring:
+            self._write(*self.ring.popleft())
+
+    def _write(self, frame, video_time, overlay):
+        if overlay is not None and self.draw is not None:
+            frame = self.draw(frame, overlay)
+        if self._writer is None:
+            height, width = frame.shape[:2]
+            self._writer = cv2.VideoWriter(self._clip["path"], self.fourcc, self.fps, (width, height))
+        self._writer.write(frame)
+        if self._clip["start_time"] is None:
+            self._clip["start_time"] = video_time
+        self._clip["end_time"] = video_time
+        self._clip["frames"] += 1
+        self.frames_written += 1
+
+    def _finish(self):
+        if self._writer is not None:
+            self._writer.release()
+        self._writer = None
+        self._clip = None
+
+    #cierra el clip abierto (fin del video o de la captura)
+    def close(self):
+        if self._clip is not None:
+            self._finish()
+        self.ring.clear()
+
+    def summary(self):
+        return {
+            "pre_roll": self.pre_roll,
+            "post_roll": self.post_roll,
+            "frames_written": self.frames_written,
+            "clips": [dict(clip) for clip in self.clips],
+        }
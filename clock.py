@@ -0,0 +1,22 @@
+# clock.py
+import cv2
+
+
+class VideoClock:
+    #tiempo de video (segundos) a partir del indice de frame, independiente de la velocidad de proceso
+
+    def __init__(self, cap, fps=None, start_frame=0, use_pos_msec=False):
+        self.cap = cap
+        self.fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30
+        self.use_pos_msec = use_pos_msec
+        self.frame_index = start_frame - 1
+
+    #llamar una vez por cada frame leído
+    def tick(self):
+        self.frame_index += 1
+        if self.use_pos_msec:
+            # CAP_PROP_POS_MSEC ya apunta al frame siguiente en algunos backends; 0 si no lo soporta
+            msec = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            if msec > 0:
+                return msec / 1000.0
+        return self.frame_index / self.fps
@@ -1,12 +1,56 @@
 # core.py
-from ultralytics import YOLO
+from ultralytics.trackers.track import TRACKER_MAP
+from ultralytics.utils import IterableSimpleNamespace, YAML
+from ultralytics.utils.checks import check_yaml
+import torch
 import cv2
 import numpy as np
-from collections import defaultdict
-import json
 from datetime import datetime
 import time
-import os
+
+from backends import load_model, warm_up
+from dwell import TrackHistory
+from profiling import StageProfiler
+from motion import FrameDiffer, make_motion_gate
+from roi import RegionTiler
+from proximity import VehicleGrid, bbox_iou, close_pairs, paired_close
+from state import EventBuffer, PairStateStore
+
+#schedule_inference: frame descartado por la compuerta de movimiento (escena quieta)
+GATED = -1
+
+#tipo de cada clase en la tabla de ParkingSecuritySystem.class_kind
+PERSON = 1
+VEHICLE = 2
+
+
+#detecciones de un frame como arrays numpy, con una sola copia al host por resultado:
+#{"xyxy": (N, 4) float32, "ids": (N,) int (-1 sin track), "conf": (N,), "cls": (N,) int}
+def detection_arrays(results):
+    parts = []
+    for result in results:
+        boxes = getattr(result, "boxes", None)
+        if boxes is None or not len(boxes):
+            continue
+        #data: x1, y1, x2, y2, [id,] conf, cls
+        data = boxes.data.cpu().numpy()
+        ids = data[:, 4] if data.shape[1] == 7 else np.full(len(data), -1, dtype=data.dtype)
+        parts.append(np.column_stack([data[:, :4], ids, data[:, -2], data[:, -1]]))
+
+    data = np.concatenate(parts) if parts else np.zeros((0, 7), dtype=np.float32)
+    return {
+        "xyxy": np.ascontiguousarray(data[:, :4], dtype=np.float32),
+        "ids": data[:, 4].astype(np.int64),
+        "conf": data[:, 5],
+        "cls": data[:, 6].astype(np.int64),
+    }
+
+
+#lista de (track_id, caja) -> (ids, cajas) en arrays
+def track_arrays(tracks):
+    if not tracks:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 4), dtype=np.float32)
+    return np.array([track_id for track_id, _ in tracks], dtype=np.int64), np.stack([box for _, box in tracks])
 
 
 class ParkingSecuritySystem:
@@ -17,50 +61,189 @@ class ParkingSecuritySystem:
         confidence=0.5,
         proximity_threshold=100,
         loitering_time_threshold=5,
+        vectorized_proximity=True,
+        spatial_index=False,
+        batch_size=1,
+        stride=1,
+        motion_threshold=None,
+        interpolate=True,
+        track_ttl=30.0,
+        max_pairs=10000,
+        events_path=None,
+        max_events=1000,
+        event_log=None,
+        camera=None,
+        motion_gate=None,
+        gate_threshold=None,
+        gate_refresh=150,
+        roi_zones=None,
+        tile_size=640,
+        tile_overlap=64,
+        backend="torch",
+        imgsz=640,
+        precision="fp32",
+        calibration_data=None,
+        profile=False,
+        profile_log_interval=None,
+        annotate=True,
+        draw_in_place=False,
+        model=None,
+        history_path=None,
+        history_interval=0.5,
+        history_segment=300.0,
     ):
-        self.model = YOLO(model_path)
+        #`model` permite compartir un YOLO ya cargado entre varios sistemas (p. ej. varias cámaras)
+        #backend "onnx"/"openvino": el modelo se exporta una vez y se reutiliza desde la caché
+        self.backend = backend
+        self.imgsz = imgsz
+        self.precision = precision
+        self.model = model if model is not None else load_model(
+            model_path, backend, imgsz, precision, calibration_data=calibration_data
+        )
+
+        #tiempos por etapa (desactivado no cuesta más que un if por etapa)
+        self.profiler = StageProfiler(enabled=profile, log_interval=profile_log_interval)
 
         #tracker
         self.use_tracker = True
         self.tracker_config = "bytetrack.yaml"
 
+        #frames por pasada del modelo en process_batch
+        self.batch_size = max(int(batch_size), 1)
+
+        #zonas de estacionamiento: el modelo solo ve los tiles que las cubren
+        self.roi = RegionTiler(roi_zones, tile_size, tile_overlap) if roi_zones else None
+
+        #paso adaptativo: inferencia cada `stride` frames o cuando hay movimiento
+        self.stride = max(int(stride), 1)
+        self.motion_threshold = motion_threshold
+        self.motion_detector = FrameDiffer(motion_threshold) if motion_threshold is not None else None
+        self.interpolate = interpolate
+
+        #compuerta de movimiento ("mog2" o "diff"): sin cambios no se infiere; se fuerza una
+        #inferencia cada `gate_refresh` frames para confirmar los tracks quietos
+        self.motion_gate_method = motion_gate
+        self.motion_gate = make_motion_gate(motion_gate, gate_threshold) if motion_gate else None
+        self.gate_refresh = max(int(gate_refresh), 1)
+
         self.confidence = confidence
 
-        #Clases
-        self.vehicle_classes = [2, 3, 5, 7]
+        #Clases; class_kind[cls] = PERSON / VEHICLE / 0 para filtrar por máscara
+        self.vehicle_classes = {2, 3, 5, 7}
         self.person_class = 0
+        self.class_kind = np.zeros(max(self.vehicle_classes | {self.person_class}) + 1, dtype=np.int8)
+        self.class_kind[self.person_class] = PERSON
+        self.class_kind[list(self.vehicle_classes)] = VEHICLE
 
         self.proximity_threshold = proximity_threshold
         self.loitering_time_threshold = loitering_time_threshold
 
-        self.suspicious_events = []
-        self.last_detection_time = defaultdict(float)
-        self.alert_triggered = set()
+        #cercanía por matrices numpy (False = bucle por parejas)
+        self.vectorized_proximity = vectorized_proximity
+
+        #rejilla de vehículos: cada persona solo se compara con los vehículos cercanos
+        self.spatial_index = spatial_index
+        self.vehicle_grid = VehicleGrid(cell_size=128)
+
+        #últimos eventos en memoria; todos van al registro en disco (events_path o un event_log compartido)
+        self.max_events = max_events
+        self.suspicious_events = None
+        #annotate=False: process_frame devuelve el frame sin dibujar y lo necesario para anotarlo
+        #después queda en last_overlay / batch_overlays (ver annotate() y clips.ClipRecorder)
+        self.annotate_frames = annotate
+        #draw_in_place: se dibuja sobre el frame recibido (sin copia) cuando el llamador no lo necesita limpio
+        self.draw_in_place = draw_in_place
+
+        #parejas (id_persona, id_vehiculo) cercanas; expiran si un track no se ve en track_ttl s
+        #(los tracks vistos también tienen tope: max_pairs por tipo)
+        self.pair_state = PairStateStore(track_ttl=track_ttl, max_pairs=max_pairs)
+        self.last_detection_time = self.pair_state.first_seen
+        self.alert_triggered = self.pair_state.alerted
+
+        #historial de tracks para análisis de permanencia (dwell.TrackHistory), solo con history_path;
+        #se escribe en segmentos de `history_segment` s de video
+        self.history_interval = history_interval
+        self.history_segment = history_segment
+        self.history = None
+
+        #sesiones iniciadas sobre este modelo (ver reset)
+        self.sessions = 0
+        self.reset(events_path, event_log, camera, history_path)
+
+    #nueva sesión sobre el modelo ya cargado (otro video, otra grabación): tracker, parejas, eventos,
+    #paso adaptativo, compuertas de movimiento y tiempos por etapa vuelven a empezar; los eventos
+    #de la sesión anterior quedan cerrados en su registro
+    def reset(self, events_path=None, event_log=None, camera=None, history_path=None):
+        if self.suspicious_events is not None:
+            self.suspicious_events.close()
+        self.suspicious_events = EventBuffer(events_path, maxlen=self.max_events, log=event_log, camera=camera)
+        if self.history is not None:
+            self.history.close()
+        self.history = (
+            TrackHistory(history_path, self.history_interval, segment_seconds=self.history_segment)
+            if history_path else None
+        )
+
+        #los ids de track empiezan de nuevo: no se mezclan con los del video anterior
+        self.tracker = self._new_tracker()
+        self.pair_state.clear()
+        self.vehicle_grid.clear()
+
+        if self.motion_detector is not None:
+            self.motion_detector.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        self.stride_stats = {
+            "frames": 0, "inferred_frames": 0, "motion_triggered": 0,
+            "gated_frames": 0, "inference_time": 0.0, "gate_time": 0.0,
+        }
+        self._frames_since_inference = 0
+        self._has_keyframe = False
+        self._last_result = None
+        self._velocity = None
+
+        #((ids, cajas) de personas, (ids, cajas) de vehículos) con track, del último frame y de cada
+        #frame del último process_batch
+        self.last_tracks = (track_arrays([]), track_arrays([]))
+        self.batch_tracks = []
+        self.last_overlay = None
+        self.batch_overlays = []
+
+        self.profiler.reset()
+        self.sessions += 1
 
 
     def bbox_iou(self, boxA, boxB):
-        xA = max(boxA[0], boxB[0])
-        yA = max(boxA[1], boxB[1])
-        xB = min(boxA[2], boxB[2])
-        yB = min(boxA[3], boxB[3])
-
-        interArea = max(0, xB - xA) * max(0, yB - yA)
-        boxAArea = (boxA[2] - boxA[0]) * (boxA[3] - boxA[1])
-        boxBArea = (boxB[2] - boxB[0]) * (boxB[3] - boxB[1])
-
-        if boxAArea == 0 or boxBArea == 0:
-            return 0
-        return interArea / float(boxAArea + boxBArea - interArea)
+        return bbox_iou(boxA, boxB)
 
 
     #Funcion principal
+    #persons / vehicles: listas de (track_id, caja)
     def detect_suspicious_activity(self, persons, vehicles, current_time):
+        return self.detect_suspicious_arrays(*track_arrays(persons), *track_arrays(vehicles), current_time)
+
+    #lo mismo con ids (N,) y cajas (N, 4) en arrays, como salen de split_tracks
+    def detect_suspicious_arrays(self, person_ids, person_boxes, vehicle_ids, vehicle_boxes, current_time):
+        person_ids = person_ids.tolist()
+        vehicle_ids = vehicle_ids.tolist()
+        self.pair_state.touch(person_ids, vehicle_ids, current_time)
+        self.pair_state.expire(current_time)
+
+        if self.spatial_index:
+            return self._detect_suspicious_activity_indexed(
+                person_ids, person_boxes, vehicle_ids, vehicle_boxes, current_time
+            )
+        if self.vectorized_proximity:
+            return self._detect_suspicious_activity_batched(
+                person_ids, person_boxes, vehicle_ids, vehicle_boxes, current_time
+            )
+
         suspicious = []
 
-        for person_id, person_box in persons:
-            for vehicle_id, vehicle_box in vehicles:
+        for person_id, person_box in zip(person_ids, person_boxes):
+            for vehicle_id, vehicle_box in zip(vehicle_ids, vehicle_boxes):
 
-                key = f"{person_id}-{vehicle_id}"
+                key = (person_id, vehicle_id)
 
                 iou = self.bbox_iou(person_box, vehicle_box)
 
@@ -73,60 +256,115 @@ class ParkingSecuritySystem:
                 proximity = self.bbox_iou(person_box, expanded)
 
                 if iou > 0.02 or proximity > 0.1:
+                    self._update_close_pair(
+                        key, person_box, vehicle_box, iou, current_time, suspicious
+                    )
+                else:
+                    self._release_pair(key, current_time)
 
-                    if key not in self.last_detection_time:
-                        self.last_detection_time[key] = current_time
+        return suspicious
 
-                    time_near = current_time - self.last_detection_time[key]
+    #misma logica, con todas las parejas en una sola operacion numpy
+    def _detect_suspicious_activity_batched(self, person_ids, person_boxes, vehicle_ids, vehicle_boxes, current_time):
+        suspicious = []
+        if not person_ids or not vehicle_ids:
+            return suspicious
 
-                    if time_near > self.loitering_time_threshold and key not in self.alert_triggered:
-                        suspicious.append({
-                            "pair_key": key,
-                            "person_box": person_box,
-                            "vehicle_box": vehicle_box,
-                            "duration": time_near,
-                            "iou": iou,
-                        })
-                        self.alert_triggered.add(key)
+        close, iou = close_pairs(person_boxes, vehicle_boxes)
 
-                else:
-                    #persistencia
-                    if key in self.last_detection_time:
-                        if current_time - self.last_detection_time[key] > 2:
-                            del self.last_detection_time[key]
-                            if key in self.alert_triggered:
-                                self.alert_triggered.remove(key)
+        # np.nonzero recorre en el mismo orden que el bucle (persona, vehiculo)
+        for i, j in zip(*np.nonzero(close)):
+            key = (person_ids[i], vehicle_ids[j])
+            self._update_close_pair(
+                key, person_boxes[i], vehicle_boxes[j], iou[i, j], current_time, suspicious
+            )
 
+        self._release_stale_pairs(person_ids, vehicle_ids, lambda i, j: close[i, j], current_time)
         return suspicious
 
-    #Dibujado
-    def draw_detections(self, frame, results, suspicious_activities):
-        annotated_frame = frame.copy()
-
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                cls = int(box.cls[0])
-                track_id = int(box.id[0]) if box.id is not None else -1
-
-                if cls == self.person_class:
-                    color = (255, 255, 0)
-                    label = f"Persona {track_id}"
-                elif cls in self.vehicle_classes:
-                    color = (0, 255, 0)
-                    label = f"Vehiculo {track_id}"
-                else:
-                    continue
+    #igual que el modo numpy, pero solo con las parejas que la rejilla deja como candidatas
+    def _detect_suspicious_activity_indexed(self, person_ids, person_boxes, vehicle_ids, vehicle_boxes, current_time):
+        suspicious = []
+        self.vehicle_grid.update(vehicle_ids, vehicle_boxes)
+        if not person_ids or not vehicle_ids:
+            return suspicious
+
+        rows = []
+        cols = []
+        for i, candidates in enumerate(self.vehicle_grid.query(person_boxes)):
+            rows.extend([i] * len(candidates))
+            cols.extend(candidates)
+
+        close_set = set()
+        if rows:
+            close, iou = paired_close(person_boxes[rows], vehicle_boxes[cols])
+
+            for k in np.nonzero(close)[0]:
+                i, j = rows[k], cols[k]
+                self._update_close_pair(
+                    (person_ids[i], vehicle_ids[j]), person_boxes[i], vehicle_boxes[j], iou[k],
+                    current_time, suspicious,
+                )
+                close_set.add((i, j))
+
+        self._release_stale_pairs(person_ids, vehicle_ids, lambda i, j: (i, j) in close_set, current_time)
+        return suspicious
 
-                cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
-                cv2.putText(annotated_frame, label, (x1, y1 - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    #persistencia: solo parejas con estado, presentes en el frame y que ya no estan cerca
+    def _release_stale_pairs(self, person_ids, vehicle_ids, is_close, current_time):
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        vehicle_index = {vehicle_id: j for j, vehicle_id in enumerate(vehicle_ids)}
+        for key in list(self.last_detection_time):
+            person_id, vehicle_id = key
+            i = person_index.get(person_id)
+            j = vehicle_index.get(vehicle_id)
+            if i is None or j is None or is_close(i, j):
+                continue
+            self._release_pair(key, current_time)
+
+    def _update_close_pair(self, key, person_box, vehicle_box, iou, current_time, suspicious):
+        self.pair_state.start(key, current_time)
+        if self.history is not None:
+            self.history.near(key, current_time)
+        time_near = current_time - self.pair_state.since(key)
+
+        if time_near > self.loitering_time_threshold and key not in self.alert_triggered:
+            suspicious.append({
+                "pair_key": f"{key[0]}-{key[1]}",
+                "person_box": person_box,
+                "vehicle_box": vehicle_box,
+                "duration": time_near,
+                "iou": iou,
+            })
+            self.alert_triggered.add(key)
+
+    def _release_pair(self, key, current_time):
+        #persistencia
+        if key in self.pair_state:
+            if current_time - self.pair_state.since(key) > 2:
+                self.pair_state.release(key)
+
+    #Dibujado (detections = detection_arrays del frame)
+    def draw_detections(self, frame, detections, suspicious_activities, in_place=False):
+        annotated_frame = frame if in_place else frame.copy()
+
+        kind = self.kinds(detections["cls"])
+        rows = np.nonzero(kind)[0]
+        boxes = detections["xyxy"][rows].astype(np.int64).tolist()
+        for (x1, y1, x2, y2), track_id, box_kind in zip(boxes, detections["ids"][rows].tolist(), kind[rows].tolist()):
+            if box_kind == PERSON:
+                color = (255, 255, 0)
+                label = f"Persona {track_id}"
+            else:
+                color = (0, 255, 0)
+                label = f"Vehiculo {track_id}"
+
+            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(annotated_frame, label, (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
 
         for activity in suspicious_activities:
             person_box = activity["person_box"]
-            vehicle_box = activity["vehicle_box"]
             duration = activity["duration"]
 
             x1, y1, x2, y2 = map(int, person_box)
@@ -136,51 +374,306 @@ class ParkingSecuritySystem:
             cv2.putText(annotated_frame, alert_text, (x1, y1 - 30),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
 
+        if self.roi is not None:
+            self.roi.draw(annotated_frame)
+
         return annotated_frame
 
-    #procesar frame
-    def process_frame(self, frame, current_time):
+    #PERSON / VEHICLE / 0 por detección (clases fuera de la tabla = 0)
+    def kinds(self, classes):
+        kind = np.zeros(len(classes), dtype=np.int8)
+        known = (classes >= 0) & (classes < len(self.class_kind))
+        kind[known] = self.class_kind[classes[known]]
+        return kind
+
+    #detecciones con track -> ((ids, cajas) de personas, (ids, cajas) de vehículos), por máscara
+    def split_tracks(self, detections):
+        kind = self.kinds(detections["cls"])
+        tracked = detections["ids"] >= 0
+        persons = tracked & (kind == PERSON)
+        vehicles = tracked & (kind == VEHICLE)
+        return (
+            (detections["ids"][persons], detections["xyxy"][persons]),
+            (detections["ids"][vehicles], detections["xyxy"][vehicles]),
+        )
+
+    #anota un frame procesado con annotate=False (overlay = last_overlay de ese frame)
+    def annotate(self, frame, overlay):
+        t = self.profiler.clock()
+        annotated_frame = self.draw_detections(frame, *overlay, in_place=self.draw_in_place)
+        self.profiler.record("draw", t)
+        return annotated_frame
 
-        if self.use_tracker:
-            results = self.model.track(
-                frame,
-                conf=self.confidence,
-                iou=0.45,
-                persist=True,
-                tracker=self.tracker_config,
-                verbose=False
-            )
+    #tracker propio (equivalente a model.track con persist=True)
+    def _new_tracker(self):
+        cfg = IterableSimpleNamespace(**YAML.load(check_yaml(self.tracker_config)))
+        return TRACKER_MAP[cfg.tracker_type](args=cfg)
+
+    def _update_tracker(self, result):
+        det = result.boxes.cpu().numpy()
+        tracks = self.tracker.update(det, result.orig_img)
+        if len(tracks) == 0:
+            #igual que on_predict_postprocess_end de ultralytics: los tracks nuevos no se muestran
+            #hasta confirmarse
+            if any(not t.is_activated for t in self.tracker.tracked_stracks):
+                return result[:0]
+            return result
+
+        idx = tracks[:, -1].astype(int)
+        result = result[idx]
+        result.update(boxes=torch.as_tensor(tracks[:, :-1]))
+        return result
+
+    #procesar frame (current_time = segundos de video, ver clock.VideoClock)
+    def process_frame(self, frame, current_time):
+        return self.process_batch([frame], [current_time])[0]
+
+    #varios frames por pasada del modelo; el tracker y la lógica de merodeo van frame a frame
+    def process_batch(self, frames, timestamps):
+        gaps = [self.schedule_inference(frame) for frame in frames]
+        detected = iter(self._detect([frame for frame, gap in zip(frames, gaps) if gap > 0]))
+
+        outputs = []
+        self.batch_tracks = []
+        self.batch_overlays = []
+        for frame, gap, current_time in zip(frames, gaps, timestamps):
+            result = next(detected) if gap > 0 else None
+            outputs.append(self.complete_frame(frame, gap, result, current_time))
+            self.batch_tracks.append(self.last_tracks)
+            self.batch_overlays.append(self.last_overlay)
+
+        self.profiler.maybe_log()
+        return outputs
+
+    #tracker + merodeo de un frame; `result` es la detección del modelo si gap > 0 (ver schedule_inference)
+    def complete_frame(self, frame, gap, result, current_time):
+        t = self.profiler.clock()
+        if gap > 0:
+            if self.use_tracker:
+                result = self._update_tracker(result)
+            self._remember_result(result, gap)
+            self.profiler.record("tracker", t)
         else:
-            results = self.model(frame, conf=self.confidence, verbose=False)
-
-        persons = []
-        vehicles = []
-
-        for result in results:
-            if not hasattr(result, "boxes"):
-                continue
-            for box in result.boxes:
-                track_id = int(box.id[0]) if box.id is not None else None
-                if track_id is None:
-                    continue
-
-                cls = int(box.cls[0])
-                bbox = box.xyxy[0].cpu().numpy()
-
-                if cls == self.person_class:
-                    persons.append((track_id, bbox))
-                elif cls in self.vehicle_classes:
-                    vehicles.append((track_id, bbox))
+            if gap == GATED:
+                #escena quieta: las cajas se mantienen donde estaban
+                self._velocity = None
+            result = self._carry_forward_result()
+            self.profiler.record("carry_forward", t)
+        return self._process_results(frame, [result], current_time)
+
+    def _detect(self, frames):
+        inputs = [self.inference_inputs(frame) for frame in frames]
+        images = [image for frame_inputs in inputs for image in frame_inputs]
+
+        #batch_size cuenta frames: los tiles de las zonas de un frame van siempre juntos en una pasada
+        step = self.batch_size * max((len(frame_inputs) for frame_inputs in inputs), default=1)
+        predictions = []
+        start_time = time.perf_counter()
+        for start in range(0, len(images), step):
+            batch = images[start:start + step]
+            predictions.extend(
+                self.model.predict(batch, conf=self.confidence, iou=0.45, imgsz=self.imgsz, verbose=False)
+            )
+        if frames:
+            self.record_inference_time(time.perf_counter() - start_time, len(frames))
+
+        t = self.profiler.clock()
+        results = []
+        offset = 0
+        for frame, frame_inputs in zip(frames, inputs):
+            results.append(self.assemble_detection(frame, predictions[offset:offset + len(frame_inputs)]))
+            offset += len(frame_inputs)
+        if self.roi is not None:
+            self.profiler.record("roi_merge", t)
+        return results
+
+    #imágenes que se envían al modelo por frame: el frame entero o los tiles de las zonas
+    def inference_inputs(self, frame):
+        return self.roi.crops(frame) if self.roi is not None else [frame]
+
+    #una detección en coordenadas del frame a partir de las predicciones de inference_inputs
+    def assemble_detection(self, frame, predictions):
+        return self.roi.assemble(frame, predictions) if self.roi is not None else predictions[0]
+
+    #tiempo del modelo atribuido a este sistema (multicam lo reparte entre cámaras)
+    def record_inference_time(self, seconds, frames=1):
+        self.stride_stats["inference_time"] += seconds
+        #una muestra por frame, no por lote, para comparar percentiles entre batch_size
+        for _ in range(frames):
+            self.profiler.add("inference", seconds / frames)
+
+    #frames transcurridos desde la última inferencia si este frame se infiere,
+    #0 si lo omite el paso adaptativo, GATED si lo descarta la compuerta de movimiento
+    def schedule_inference(self, frame):
+        self.stride_stats["frames"] += 1
+        self._frames_since_inference += 1
+
+        if self.motion_gate is not None:
+            gate_start = time.perf_counter()
+            idle = not self.motion_gate.changed(frame)
+            gate_time = time.perf_counter() - gate_start
+            self.stride_stats["gate_time"] += gate_time
+            self.profiler.add("motion_gate", gate_time)
+            if idle and self._has_keyframe and self._frames_since_inference < self.gate_refresh:
+                self.stride_stats["gated_frames"] += 1
+                return GATED
+
+        motion = self.motion_detector is not None and self.motion_detector.changed(frame)
+        due = not self._has_keyframe or self._frames_since_inference >= self.stride
+        if not (due or motion):
+            return 0
 
-        suspicious = self.detect_suspicious_activity(persons, vehicles, current_time)
+        if motion and not due:
+            self.stride_stats["motion_triggered"] += 1
+        if self.motion_detector is not None:
+            self.motion_detector.mark_reference()
+        if self.motion_gate is not None:
+            self.motion_gate.mark_reference()
+
+        gap = self._frames_since_inference
+        self._frames_since_inference = 0
+        self._has_keyframe = True
+        self.stride_stats["inferred_frames"] += 1
+        return gap
+
+    def _remember_result(self, result, gap):
+        self._velocity = None
+        previous = self._last_result
+        self._last_result = result
+
+        if not self.interpolate or previous is None:
+            return
+        if result.boxes.id is None or previous.boxes.id is None:
+            return
+
+        #velocidad por frame de cada track entre las dos últimas inferencias
+        previous_boxes = dict(zip(previous.boxes.id.int().tolist(), previous.boxes.xyxy))
+        velocity = torch.zeros_like(result.boxes.xyxy)
+        for row, (track_id, box) in enumerate(zip(result.boxes.id.int().tolist(), result.boxes.xyxy)):
+            if track_id in previous_boxes:
+                velocity[row] = (box - previous_boxes[track_id]) / gap
+        self._velocity = velocity
+
+    #cajas de la última inferencia, desplazadas según su velocidad
+    def _carry_forward_result(self):
+        result = self._last_result
+        if self._velocity is None:
+            return result
+
+        data = result.boxes.data.clone()
+        data[:, :4] += self._velocity * self._frames_since_inference
+        moved = result.new()
+        moved.update(boxes=data)
+        return moved
+
+    #vacía y cierra el registro de eventos propio (uno compartido lo cierra quien lo creó)
+    def close(self):
+        self.suspicious_events.close()
+        if self.history is not None:
+            self.history.close()
+
+    #inferencia de prueba con el tamaño de lote y de entrada configurados (no toca el tracker)
+    def warm_up(self, runs=1):
+        return warm_up(self.model, self.imgsz, self.batch_size, runs, conf=self.confidence, iou=0.45)
+
+    #tamaño actual del estado en memoria
+    def state_metrics(self):
+        return dict(
+            self.pair_state.metrics(),
+            events_in_memory=len(self.suspicious_events),
+            total_events=self.suspicious_events.total,
+        )
+
+    def stride_statistics(self, processing_time=None):
+        frames = self.stride_stats["frames"]
+        inferred = self.stride_stats["inferred_frames"]
+        stats = {
+            "policy": {
+                "stride": self.stride,
+                "motion_threshold": self.motion_threshold,
+                "interpolate": self.interpolate,
+            },
+            "frames": frames,
+            "inferred_frames": inferred,
+            "skipped_frames": frames - inferred,
+            "motion_triggered": self.stride_stats["motion_triggered"],
+            "inference_ratio": inferred / frames if frames else 0.0,
+        }
+        if processing_time:
+            stats["effective_fps"] = frames / processing_time
+            stats["inference_fps"] = inferred / processing_time
+            stats["fps_gained"] = stats["effective_fps"] - stats["inference_fps"]
+        return stats
+
+    #frames descartados por la compuerta de movimiento y tiempo de modelo ahorrado
+    def gate_statistics(self):
+        frames = self.stride_stats["frames"]
+        inferred = self.stride_stats["inferred_frames"]
+        gated = self.stride_stats["gated_frames"]
+        inference_time = self.stride_stats["inference_time"]
+        gate_time = self.stride_stats["gate_time"]
+        per_frame = inference_time / inferred if inferred else 0.0
+        return {
+            "method": self.motion_gate_method,
+            "threshold": self.motion_gate.threshold if self.motion_gate is not None else None,
+            "refresh_frames": self.gate_refresh,
+            "gated_frames": gated,
+            "gated_fraction": gated / frames if frames else 0.0,
+            "inference_time": inference_time,
+            "inference_ms_per_frame": per_frame * 1000,
+            "gate_time": gate_time,
+            "estimated_time_saved": gated * per_frame - gate_time,
+        }
+
+    def _process_results(self, frame, results, current_time):
+        t = self.profiler.clock()
+
+        #una conversión por frame; la cercanía y el dibujado reutilizan los mismos arrays
+        detections = detection_arrays(results)
+        persons, vehicles = self.split_tracks(detections)
+
+        self.last_tracks = (persons, vehicles)
+        t = self.profiler.record("extract", t)
+        suspicious = self.detect_suspicious_arrays(*persons, *vehicles, current_time)
+        t = self.profiler.record("proximity", t)
+        if self.history is not None and self.history.sample(current_time, frame.shape, *persons, *vehicles):
+            t = self.profiler.record("history", t)
 
         if suspicious:
             for event in suspicious:
                 self.suspicious_events.append({
                     "timestamp": datetime.now().isoformat(),
+                    "video_time": float(current_time),
+                    "pair_key": event["pair_key"],
                     "duration": float(event["duration"]),
                     "iou": float(event["iou"])
                 })
+            t = self.profiler.record("events", t)
+
+        self.suspicious_events.maybe_flush()
 
-        annotated_frame = self.draw_detections(frame, results, suspicious)
+        self.last_overlay = (detections, suspicious)
+        if not self.annotate_frames:
+            return frame, len(suspicious)
+        annotated_frame = self.draw_detections(frame, detections, suspicious, in_place=self.draw_in_place)
+        self.profiler.record("draw", t)
         return annotated_frame, len(suspicious)
+
+
+#un sistema por proceso para trabajos por lotes: el modelo se carga con el primer video y los
+#siguientes (con las mismas opciones) son sesiones nuevas sobre él
+_session_system = None
+_session_options = None
+
+
+def session_system(events_path=None, event_log=None, camera=None, history_path=None, **options):
+    global _session_system, _session_options
+    key = repr(sorted(options.items()))
+    if _session_system is None or key != _session_options:
+        _session_system = ParkingSecuritySystem(
+            events_path=events_path, event_log=event_log, camera=camera, history_path=history_path, **options
+        )
+        _session_options = key
+    else:
+        _session_system.reset(events_path, event_log, camera, history_path)
+    return _session_system
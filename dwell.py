@@ -0,0 +1,379 @@
+# dwell.py
+# Historial de tracks para análisis de permanencia: posición de cada track a frecuencia reducida e
+# intervalos de cercanía persona-vehículo, guardados en columnas (.npz) que se consultan después
+# sobre muchos videos sin volver a procesarlos.
+#   python dwell.py resumen resultados/*_dwell.npz
+#   python dwell.py vehiculos resultados/*_dwell.npz --top 20
+#   python dwell.py personas resultados/*_dwell.npz --min-vehiculos 2
+#   python dwell.py mapa resultados/*_dwell.npz --salida paradas.png
+import argparse
+import json
+import os
+
+import cv2
+import numpy as np
+
+from events import remove_log, segment_path
+
+#tipo de track en la columna `kind` (mismos valores que core.PERSON / core.VEHICLE)
+PERSON = 1
+VEHICLE = 2
+
+
+class TrackHistory:
+    #sample() guarda la posición de todos los tracks cada `sample_interval` s de video (centro inferior
+    #de la caja: donde la persona pisa); near() se llama por cada pareja cercana en cada frame y
+    #extiende su intervalo, que se cierra tras `gap` s sin cercanía.
+    #Las muestras y los intervalos cerrados se escriben en un segmento nuevo cada `segment_seconds` s
+    #de video o `segment_rows` muestras (segmento 0 = path, los siguientes <stem>.<n>.npz, como en
+    #events.py) y se sueltan de memoria: en una cámara 24/7 la memoria no crece y un corte pierde
+    #como mucho el último segmento
+
+    def __init__(self, path=None, sample_interval=0.5, gap=2.0, segment_seconds=300.0, segment_rows=200_000):
+        self.path = path
+        self.sample_interval = sample_interval
+        self.gap = gap
+        self.segment_seconds = segment_seconds
+        self.segment_rows = segment_rows
+        self.frame_size = (0, 0)
+
+        #bloques de columnas por muestra; se concatenan al escribir el segmento
+        self._samples = {"time": [], "track": [], "kind": [], "x": [], "y": []}
+        self._rows = 0
+        self._next_sample = None
+        self._segment_start = None
+        #(persona, vehiculo) -> [inicio, último tiempo cerca]
+        self._open = {}
+        self._closed = {"person": [], "vehicle": [], "start": [], "end": []}
+
+        #totales de lo ya escrito
+        self.segment = 0
+        self.saved_samples = 0
+        self.saved_intervals = 0
+        self.closed = False
+        #los segmentos de una sesión anterior con el mismo path no se mezclan con esta
+        if path:
+            remove_log(path)
+
+    def near(self, key, current_time):
+        interval = self._open.get(key)
+        if interval is None:
+            self._open[key] = [current_time, current_time]
+        else:
+            interval[1] = current_time
+
+    #devuelve False si todavía no toca muestrear
+    def sample(self, current_time, frame_shape, person_ids, person_boxes, vehicle_ids, vehicle_boxes):
+        if self._next_sample is not None and current_time < self._next_sample:
+            return False
+        self._next_sample = current_time + self.sample_interval
+        self.frame_size = (frame_shape[1], frame_shape[0])
+        if self._segment_start is None:
+            self._segment_start = current_time
+
+        ids = np.concatenate([person_ids, vehicle_ids])
+        if len(ids):
+            boxes = np.concatenate([person_boxes, vehicle_boxes])
+            self._samples["time"].append(np.full(len(ids), current_time, dtype=np.float64))
+            self._samples["track"].append(ids.astype(np.int64))
+            self._samples["kind"].append(
+                np.repeat(np.array([PERSON, VEHICLE], dtype=np.int8), [len(person_ids), len(vehicle_ids)])
+            )
+            self._samples["x"].append(((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.float32))
+            self._samples["y"].append(boxes[:, 3].astype(np.float32))
+            self._rows += len(ids)
+
+        #los intervalos se cierran solo al muestrear (no se recorren en cada frame)
+        stale = [key for key, (_, last) in self._open.items() if current_time - last > self.gap]
+        for key in stale:
+            self._close(key)
+
+        if self.path and (
+            self._rows >= self.segment_rows or current_time - self._segment_start >= self.segment_seconds
+        ):
+            self.flush()
+        return True
+
+    def _close(self, key):
+        start, end = self._open.pop(key)
+        self._closed["person"].append(key[0])
+        self._closed["vehicle"].append(key[1])
+        self._closed["start"].append(start)
+        self._closed["end"].append(end)
+
+    #columnas en memoria (las que no se escribieron todavía); con `open_intervals` los intervalos
+    #abiertos se cuentan hasta la última vez que se vieron cerca
+    def columns(self, open_intervals=True):
+        columns = {
+            name: np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+            for (name, chunks), dtype in zip(
+                self._samples.items(), (np.float64, np.int64, np.int8, np.float32, np.float32)
+            )
+        }
+        keys = list(self._open) if open_intervals else []
+        persons = self._closed["person"] + [k[0] for k in keys]
+        vehicles = self._closed["vehicle"] + [k[1] for k in keys]
+        starts = self._closed["start"] + [self._open[k][0] for k in keys]
+        ends = self._closed["end"] + [self._open[k][1] for k in keys]
+        columns.update(
+            pair_person=np.asarray(persons, dtype=np.int64),
+            pair_vehicle=np.asarray(vehicles, dtype=np.int64),
+            pair_start=np.asarray(starts, dtype=np.float64),
+            pair_end=np.asarray(ends, dtype=np.float64),
+        )
+        return columns
+
+    #escribe lo que está en memoria como un segmento nuevo y lo suelta; los intervalos abiertos
+    #siguen en memoria salvo al cerrar (`open_intervals`)
+    def flush(self, open_intervals=False):
+        if not self.path:
+            return None
+        columns = self.columns(open_intervals)
+        path = segment_path(self.path, self.segment)
+        #se escribe aparte y se renombra: un corte a mitad de escritura no deja un segmento roto
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            sample_interval=self.sample_interval,
+            gap=self.gap,
+            frame_size=np.asarray(self.frame_size, dtype=np.int32),
+            **columns,
+        )
+        os.replace(tmp_path, path)
+
+        self.segment += 1
+        self.saved_samples += len(columns["time"])
+        self.saved_intervals += len(columns["pair_start"])
+        self._samples = {name: [] for name in self._samples}
+        self._rows = 0
+        self._segment_start = None
+        self._closed = {name: [] for name in self._closed}
+        if open_intervals:
+            self._open.clear()
+        return path
+
+    #una sola vez: close() del sistema y reset() de la sesión siguiente pueden llamarlo los dos
+    def close(self):
+        if self.path and not self.closed:
+            self.flush(open_intervals=True)
+        self.closed = True
+
+    def summary(self):
+        return {
+            "path": self.path,
+            "segments": [segment_path(self.path, s) for s in range(self.segment)] if self.path else [],
+            "sample_interval": self.sample_interval,
+            "samples": self.saved_samples + self._rows,
+            "pair_intervals": self.saved_intervals + len(self._closed["start"]) + len(self._open),
+        }
+
+
+class DwellIndex:
+    #historiales de uno o más videos en columnas; `video` = posición del archivo en `sources`
+
+    def __init__(self, sources, columns, frame_sizes, sample_intervals):
+        self.sources = list(sources)
+        self.columns = columns
+        self.frame_sizes = np.asarray(frame_sizes, dtype=np.float64).reshape(-1, 2)
+        self.sample_intervals = np.asarray(sample_intervals, dtype=np.float64)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def pair_durations(self):
+        return self.columns["pair_end"] - self.columns["pair_start"]
+
+    #por vehículo: segundos con alguna persona cerca (intervalos que se solapan cuentan una vez),
+    #segundos-persona (suma de todos los intervalos), visitas y personas distintas
+    def dwell_per_vehicle(self):
+        c = self.columns
+        keys = np.column_stack([c["pair_video"], c["pair_vehicle"]])
+        if not len(keys):
+            return []
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        person_seconds = np.bincount(inverse, weights=self.pair_durations(), minlength=len(groups))
+        visits = np.bincount(inverse, minlength=len(groups))
+        _, first = np.unique(np.column_stack([inverse, c["pair_person"]]), axis=0, return_index=True)
+        persons = np.bincount(inverse[first], minlength=len(groups))
+        total = self._covered_seconds(inverse, len(groups))
+
+        order = np.argsort(-total, kind="stable")
+        return [
+            {
+                "source": self.sources[groups[g, 0]],
+                "vehicle_id": int(groups[g, 1]),
+                "dwell": float(total[g]),
+                "person_seconds": float(person_seconds[g]),
+                "visits": int(visits[g]),
+                "persons": int(persons[g]),
+            }
+            for g in order
+        ]
+
+    #largo de la unión de los intervalos de cada grupo: ordenados por (grupo, inicio), un intervalo
+    #abre un tramo nuevo si empieza después del final más tardío de los anteriores del mismo grupo
+    def _covered_seconds(self, group, n_groups):
+        start, end = self.columns["pair_start"], self.columns["pair_end"]
+        order = np.lexsort((start, group))
+        group, start, end = group[order], start[order], end[order]
+        first = np.ones(len(group), dtype=bool)
+        first[1:] = group[1:] != group[:-1]
+        #el máximo acumulado no debe cruzar de un grupo a otro: se reinicia al comienzo de cada grupo
+        reach = end.copy()
+        bounds = np.append(np.nonzero(first)[0], len(group))
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            np.maximum.accumulate(reach[a:b], out=reach[a:b])
+        opens = first.copy()
+        opens[1:] |= start[1:] > reach[:-1]
+        runs = np.nonzero(opens)[0]
+        run_end = np.maximum.reduceat(end, runs)
+        return np.bincount(group[runs], weights=run_end - start[runs], minlength=n_groups)
+
+    #personas que estuvieron cerca de al menos `min_vehicles` vehículos distintos
+    #(intervalos de menos de `min_duration` s no cuentan, p. ej. pasar caminando)
+    def multi_vehicle_persons(self, min_vehicles=2, min_duration=0.0):
+        c = self.columns
+        keep = self.pair_durations() >= min_duration
+        triples = np.unique(
+            np.column_stack([c["pair_video"], c["pair_person"], c["pair_vehicle"]])[keep], axis=0
+        )
+        if not len(triples):
+            return []
+        persons, start, counts = np.unique(triples[:, :2], axis=0, return_index=True, return_counts=True)
+        found = []
+        for p in np.nonzero(counts >= min_vehicles)[0]:
+            vehicles = triples[start[p]:start[p] + counts[p], 2]
+            found.append({
+                "source": self.sources[persons[p, 0]],
+                "person_id": int(persons[p, 1]),
+                "vehicles": vehicles.tolist(),
+            })
+        found.sort(key=lambda row: -len(row["vehicles"]))
+        return found
+
+    #segundos que las personas pasaron detenidas (velocidad < max_speed px/s entre dos muestras) en
+    #cada celda de una rejilla `bins` (ancho, alto) sobre el frame normalizado, sumando todos los videos
+    def stop_heatmap(self, bins=(64, 36), max_speed=20.0, source=None):
+        c = self.columns
+        mask = c["kind"] == PERSON
+        if source is not None:
+            mask &= c["video"] == self.sources.index(source)
+        video, track, time = c["video"][mask], c["track"][mask], c["time"][mask]
+        x, y = c["x"][mask], c["y"][mask]
+
+        order = np.lexsort((time, track, video))
+        video, track, time, x, y = video[order], track[order], time[order], x[order], y[order]
+        #velocidad contra la muestra anterior del mismo track
+        same = (video[1:] == video[:-1]) & (track[1:] == track[:-1])
+        dt = np.diff(time)
+        speed = np.hypot(np.diff(x), np.diff(y)) / np.where(dt > 0, dt, np.inf)
+        stopped = np.zeros(len(time), dtype=bool)
+        stopped[1:] = same & (speed < max_speed)
+
+        size = self.frame_sizes[video]
+        size = np.where(size > 0, size, 1.0)
+        heatmap, _, _ = np.histogram2d(
+            y[stopped] / size[stopped, 1],
+            x[stopped] / size[stopped, 0],
+            bins=(bins[1], bins[0]),
+            range=((0, 1), (0, 1)),
+            weights=self.sample_intervals[video[stopped]],
+        )
+        return heatmap
+
+    def summary(self):
+        c = self.columns
+        durations = self.pair_durations()
+        return {
+            "sources": self.sources,
+            "samples": int(len(c["time"])),
+            "person_tracks": int(len(np.unique(
+                np.column_stack([c["video"], c["track"]])[c["kind"] == PERSON], axis=0
+            ))),
+            "pair_intervals": int(len(durations)),
+            "total_dwell": float(durations.sum()),
+            "max_interval": float(durations.max()) if len(durations) else 0.0,
+        }
+
+
+#segmentos escritos de un historial, en orden
+def history_segments(path):
+    segments = []
+    while os.path.exists(segment_path(path, len(segments))):
+        segments.append(segment_path(path, len(segments)))
+    return segments
+
+
+#une los historiales escritos por TrackHistory (todos los segmentos de cada uno)
+def load_dwell(paths):
+    if isinstance(paths, str):
+        paths = [paths]
+    parts = []
+    frame_sizes = []
+    intervals = []
+    for video, path in enumerate(paths):
+        segments = history_segments(path)
+        if not segments:
+            raise FileNotFoundError(path)
+        chunks = []
+        for segment in segments:
+            with np.load(segment) as data:
+                chunks.append({name: data[name] for name in data.files if data[name].ndim == 1 and name != "frame_size"})
+                frame_size = data["frame_size"]
+                interval = float(data["sample_interval"])
+        part = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+        frame_sizes.append(frame_size)
+        intervals.append(interval)
+        part["video"] = np.full(len(part["time"]), video, dtype=np.int32)
+        part["pair_video"] = np.full(len(part["pair_start"]), video, dtype=np.int32)
+        parts.append(part)
+
+    names = parts[0].keys() if parts else []
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in names}
+    return DwellIndex(paths, columns, frame_sizes, intervals)
+
+
+def heatmap_image(heatmap, size=(640, 360)):
+    scaled = heatmap / heatmap.max() if heatmap.max() > 0 else heatmap
+    image = cv2.applyColorMap((scaled * 255).astype(np.uint8), cv2.COLORMAP_JET)
+    return cv2.resize(image, size, interpolation=cv2.INTER_NEAREST)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas de permanencia sobre historiales de tracks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary_parser = sub.add_parser("resumen")
+    summary_parser.add_argument("paths", nargs="+")
+    vehicles_parser = sub.add_parser("vehiculos", help="tiempo total con personas cerca, por vehículo")
+    vehicles_parser.add_argument("paths", nargs="+")
+    vehicles_parser.add_argument("--top", type=int, default=20)
+    persons_parser = sub.add_parser("personas", help="personas que se acercaron a varios vehículos")
+    persons_parser.add_argument("paths", nargs="+")
+    persons_parser.add_argument("--min-vehiculos", type=int, default=2)
+    persons_parser.add_argument("--min-segundos", type=float, default=1.0, help="duración mínima de cada acercamiento")
+    map_parser = sub.add_parser("mapa", help="mapa de calor de dónde se detienen las personas")
+    map_parser.add_argument("paths", nargs="+")
+    map_parser.add_argument("--salida", default="paradas.png")
+    map_parser.add_argument("--velocidad", type=float, default=20.0, help="px/s por debajo de los cuales está detenida")
+    args = parser.parse_args(argv)
+
+    index = load_dwell(args.paths)
+    if args.command == "resumen":
+        print(json.dumps(index.summary(), indent=2, ensure_ascii=False))
+    elif args.command == "vehiculos":
+        for row in index.dwell_per_vehicle()[:args.top]:
+            print(
+                f"{row['source']}  vehículo {row['vehicle_id']}: {row['dwell']:.1f}s con alguien cerca, "
+                f"{row['person_seconds']:.1f} segundos-persona ({row['visits']} acercamientos, {row['persons']} personas)"
+            )
+    elif args.command == "personas":
+        for row in index.multi_vehicle_persons(args.min_vehiculos, args.min_segundos):
+            print(f"{row['source']}  persona {row['person_id']}: vehículos {row['vehicles']}")
+    else:
+        cv2.imwrite(args.salida, heatmap_image(index.stop_heatmap(max_speed=args.velocidad)))
+        print(f"Mapa guardado en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
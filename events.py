@@ -0,0 +1,282 @@
+# events.py
+# Registro de eventos en disco: JSON Lines de solo agregado, con escritura en búfer, rotación e índice.
+#   python events.py resumen resultados/video_events.jsonl
+#   python events.py buscar resultados/events.jsonl --desde 60 --hasta 120 --camara entrada
+import argparse
+import glob
+import json
+import os
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+#registro del índice por evento (INDEX_DTYPE.itemsize = 36 bytes); `offset`/`length` apuntan a la línea dentro del segmento
+INDEX_DTYPE = np.dtype([
+    ("video_time", "<f8"),
+    ("wall_time", "<f8"),
+    ("camera", "<i4"),
+    ("segment", "<i4"),
+    ("offset", "<i8"),
+    ("length", "<i4"),
+])
+
+
+def _stem(path):
+    return os.path.splitext(path)[0]
+
+
+#segmento 0 = path; los siguientes <stem>.<n><ext>
+def segment_path(path, segment):
+    if segment == 0:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{segment}{ext}"
+
+
+def index_paths(path):
+    stem = _stem(path)
+    return stem + ".idx", stem + ".idx.json"
+
+
+#borra todos los archivos de un registro (segmentos e índice)
+def remove_log(path):
+    stem, ext = os.path.splitext(path)
+    candidates = [path, *index_paths(path), *glob.glob(f"{glob.escape(stem)}.*{ext}")]
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+
+class EventLog:
+    #escritura de eventos en búfer: se vacía cada `flush_every` eventos o `flush_interval` s;
+    #rota el segmento al pasar `max_bytes` o `rotate_seconds`
+
+    def __init__(self, path, flush_interval=1.0, flush_every=64, max_bytes=None, rotate_seconds=None, recent=10):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+
+        self.index_path, self.meta_path = index_paths(path)
+        self.cameras = []
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.cameras = json.load(f)["cameras"]
+
+        #se continúa en el último segmento existente
+        self.segment = 0
+        while os.path.exists(segment_path(path, self.segment + 1)):
+            self.segment += 1
+
+        #resumen incremental para el reporte
+        self.total = 0
+        self.by_camera = Counter()
+        self.first_time = None
+        self.last_time = None
+        self.max_duration = 0.0
+        self.recent = deque(maxlen=recent)
+
+        self._pending = 0
+        #registros del índice que esperan a que sus líneas estén escritas (ver flush)
+        self._index_records = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._index = None
+        self._open_segment()
+
+    def _open_segment(self):
+        self._file = open(segment_path(self.path, self.segment), "ab")
+        self._offset = self._file.tell()
+        self._segment_started = time.monotonic()
+        if self._index is None:
+            self._index = open(self.index_path, "ab")
+
+    def _rotate(self):
+        self.flush()
+        self._file.close()
+        self.segment += 1
+        self._open_segment()
+
+    def _camera_code(self, camera):
+        if camera is None:
+            return -1
+        if camera not in self.cameras:
+            self.cameras.append(camera)
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"cameras": self.cameras}, f)
+        return self.cameras.index(camera)
+
+    def append(self, event, camera=None):
+        if camera is not None:
+            event = dict(event, camera=camera)
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+
+        if self._offset and (
+            (self.max_bytes and self._offset + len(line) > self.max_bytes)
+            or (self.rotate_seconds and time.monotonic() - self._segment_started >= self.rotate_seconds)
+        ):
+            self._rotate()
+
+        record = np.zeros(1, dtype=INDEX_DTYPE)
+        record["video_time"] = event.get("video_time", np.nan)
+        record["wall_time"] = time.time()
+        record["camera"] = self._camera_code(camera)
+        record["segment"] = self.segment
+        record["offset"] = self._offset
+        record["length"] = len(line)
+
+        self._file.write(line)
+        self._index_records.append(record.tobytes())
+        self._offset += len(line)
+        self._pending += 1
+        self._summarize(event, camera)
+
+        if self._pending >= self.flush_every:
+            self.flush()
+        else:
+            self.maybe_flush()
+
+    def _summarize(self, event, camera):
+        self.total += 1
+        self.by_camera[camera or "-"] += 1
+        video_time = event.get("video_time")
+        if video_time is not None:
+            self.first_time = video_time if self.first_time is None else min(self.first_time, video_time)
+            self.last_time = video_time if self.last_time is None else max(self.last_time, video_time)
+        self.max_duration = max(self.max_duration, event.get("duration", 0.0))
+        self.recent.append(event)
+
+    #los datos antes que el índice: los registros del índice solo se escriben acá, después de vaciar el
+    #segmento, así que el índice nunca apunta a una línea que no está en disco
+    def flush(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        if self._index_records:
+            self._index.write(b"".join(self._index_records))
+            self._index_records.clear()
+        self._index.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._index.close()
+        self._file = None
+        self._index = None
+
+    def summary(self):
+        return {
+            "path": self.path,
+            "segments": [segment_path(self.path, s) for s in range(self.segment + 1)],
+            "index_path": self.index_path,
+            "total_events": self.total,
+            "events_by_camera": dict(self.by_camera),
+            "first_video_time": self.first_time,
+            "last_video_time": self.last_time,
+            "max_duration": self.max_duration,
+        }
+
+
+class EventLogReader:
+    #consultas sobre el índice sin leer todo el registro
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path, self.meta_path = index_paths(path)
+        self.cameras = []
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.cameras = json.load(f)["cameras"]
+        self.index = (
+            np.fromfile(self.index_path, dtype=INDEX_DTYPE)
+            if os.path.exists(self.index_path) else np.zeros(0, dtype=INDEX_DTYPE)
+        )
+
+    def __len__(self):
+        return len(self.index)
+
+    #filas del índice entre `start` y `end` (segundos de video, o epoch con clock="wall") y de `camera`
+    def select(self, start=None, end=None, camera=None, clock="video"):
+        times = self.index["video_time" if clock == "video" else "wall_time"]
+        mask = np.ones(len(self.index), dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times <= end
+        if camera is not None:
+            code = self.cameras.index(camera) if camera in self.cameras else -2
+            mask &= self.index["camera"] == code
+        return self.index[mask]
+
+    def read(self, rows):
+        events = []
+        handles = {}
+        try:
+            for row in rows:
+                segment = int(row["segment"])
+                if segment not in handles:
+                    handles[segment] = open(segment_path(self.path, segment), "rb")
+                f = handles[segment]
+                f.seek(int(row["offset"]))
+                events.append(json.loads(f.read(int(row["length"]))))
+        finally:
+            for f in handles.values():
+                f.close()
+        return events
+
+    def query(self, start=None, end=None, camera=None, clock="video"):
+        return self.read(self.select(start, end, camera, clock))
+
+    #el mismo resumen que EventLog.summary, reconstruido desde disco (p. ej. tras una caída)
+    def summary(self):
+        index = self.index
+        by_camera = Counter()
+        for code, count in zip(*np.unique(index["camera"], return_counts=True)):
+            by_camera[self.cameras[code] if code >= 0 else "-"] = int(count)
+        times = index["video_time"][~np.isnan(index["video_time"])]
+        durations = [ev.get("duration", 0.0) for ev in self.read(index)] if len(index) else []
+        segments = int(index["segment"].max()) + 1 if len(index) else 1
+        return {
+            "path": self.path,
+            "segments": [segment_path(self.path, s) for s in range(segments)],
+            "index_path": self.index_path,
+            "total_events": int(len(index)),
+            "events_by_camera": dict(by_camera),
+            "first_video_time": float(times.min()) if len(times) else None,
+            "last_video_time": float(times.max()) if len(times) else None,
+            "max_duration": max(durations, default=0.0),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas sobre el registro de eventos")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary_parser = sub.add_parser("resumen")
+    summary_parser.add_argument("path")
+    search = sub.add_parser("buscar")
+    search.add_argument("path")
+    search.add_argument("--desde", type=float, default=None, help="segundos de video")
+    search.add_argument("--hasta", type=float, default=None)
+    search.add_argument("--camara", default=None)
+    args = parser.parse_args(argv)
+
+    reader = EventLogReader(args.path)
+    if args.command == "resumen":
+        print(json.dumps(reader.summary(), indent=2, ensure_ascii=False))
+    else:
+        for event in reader.query(args.desde, args.hasta, args.camara):
+            print(json.dumps(event, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# motion.py
+import cv2
+import numpy as np
+
+
+class FrameDiffer:
+    #diferencia de frames a baja resolución contra el último frame inferido
+
+    def __init__(self, threshold=0.02, size=(64, 36), pixel_delta=25):
+        self.threshold = threshold
+        self.size = size
+        self.pixel_delta = pixel_delta
+        self.reference = None
+        self._current = None
+
+    def _prepare(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (3, 3), 0)
+
+    #fracción de pixeles que cambiaron respecto a la referencia
+    def score(self, frame):
+        self._current = self._prepare(frame)
+        if self.reference is None:
+            return 1.0
+        diff = cv2.absdiff(self._current, self.reference)
+        return np.count_nonzero(diff > self.pixel_delta) / diff.size
+
+    def changed(self, frame):
+        return self.score(frame) > self.threshold
+
+    #el último frame evaluado pasa a ser la referencia
+    def mark_reference(self):
+        self.reference = self._current
+
+    def reset(self):
+        self.reference = None
+        self._current = None
+
+
+class BackgroundGate:
+    #sustracción de fondo MOG2 a baja resolución; el fondo se aprende con todos los frames
+
+    def __init__(self, threshold=0.002, size=(160, 90), history=500, var_threshold=16):
+        self.threshold = threshold
+        self.size = size
+        self.history = history
+        self.var_threshold = var_threshold
+        self.reset()
+
+    def _prepare(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    #fracción de pixeles en primer plano
+    def score(self, frame):
+        mask = self.subtractor.apply(self._prepare(frame))
+        return np.count_nonzero(mask) / mask.size
+
+    def changed(self, frame):
+        return self.score(frame) > self.threshold
+
+    #el fondo no depende de qué frames se infieren
+    def mark_reference(self):
+        pass
+
+    def reset(self):
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=self.history, varThreshold=self.var_threshold, detectShadows=False
+        )
+
+
+#compuerta de movimiento: "mog2" (fondo aprendido) o "diff" (contra el último frame inferido)
+def make_motion_gate(method, threshold=None, size=(160, 90)):
+    if method == "mog2":
+        return BackgroundGate(threshold if threshold is not None else 0.002, size=size)
+    if method == "diff":
+        return FrameDiffer(threshold if threshold is not None else 0.002, size=size)
+    raise ValueError(f"Método de compuerta desconocido: {method}")
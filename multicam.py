@@ -0,0 +1,314 @@
+# multicam.py
+# Varias cámaras con un solo modelo YOLO: tracker y estado de merodeo por cámara, inferencia en lotes compartidos.
+#   python multicam.py entrada=rtsp://camara1/stream patio=rtsp://camara2/stream -b 8
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+
+from backends import add_backend_arguments, check_backend_arguments, load_model
+from clock import VideoClock
+from core import ParkingSecuritySystem
+from events import EventLog
+from report import build_report, write_report
+from stream import parse_source
+
+
+class CameraStream:
+    #hilo de lectura de una cámara con su propia cola acotada y su ParkingSecuritySystem
+
+    def __init__(self, name, source, system, queue_size=4):
+        self.name = name
+        self.source = parse_source(source)
+        self.system = system
+
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"No se pudo abrir la cámara {name}: {source}")
+
+        #archivo: tiempo de video y sin descartes; en vivo: tiempo de captura y gana el frame más nuevo
+        self.live = not (isinstance(self.source, str) and os.path.isfile(self.source))
+        self.clock = None if self.live else VideoClock(self.cap)
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.finished = False
+        self.captured = 0
+        self.dropped = 0
+        self.processed = 0
+        self.alerts = 0
+        self.start_time = None
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._read_loop, name=f"camera-{name}", daemon=True)
+
+    def start(self):
+        self.start_time = time.monotonic()
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        self.cap.release()
+
+    def _read_loop(self):
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.captured += 1
+                timestamp = time.monotonic() - self.start_time if self.live else self.clock.tick()
+
+                if self.live:
+                    while True:
+                        try:
+                            self.queue.put_nowait((frame, timestamp))
+                            break
+                        except queue.Full:
+                            try:
+                                self.queue.get_nowait()
+                                self.dropped += 1
+                            except queue.Empty:
+                                pass
+                else:
+                    while not self._stop_event.is_set():
+                        try:
+                            self.queue.put((frame, timestamp), timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+        finally:
+            self.finished = True
+
+    def poll(self):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    @property
+    def done(self):
+        return self.finished and self.queue.empty()
+
+    def metrics(self):
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+        return {
+            "frames_captured": self.captured,
+            "frames_processed": self.processed,
+            "frames_dropped": self.dropped,
+            "fps": self.processed / elapsed if elapsed > 0 else 0.0,
+            "queue_depth": self.queue.qsize(),
+            "total_alerts": self.alerts,
+            "state": self.system.state_metrics(),
+        }
+
+
+class MultiCameraEngine:
+    #un modelo cargado una vez; los frames de todas las cámaras se reparten en lotes por turnos
+
+    def __init__(
+        self,
+        model_path="yolov8m.pt",
+        batch_size=8,
+        confidence=0.5,
+        backend="torch",
+        imgsz=640,
+        precision="fp32",
+        calibration_data=None,
+        model=None,
+        **system_options,
+    ):
+        self.model = model if model is not None else load_model(
+            model_path, backend, imgsz, precision, calibration_data=calibration_data
+        )
+        self.batch_size = max(int(batch_size), 1)
+        self.confidence = confidence
+        self.imgsz = imgsz
+        self.system_options = system_options
+        self.cameras = OrderedDict()
+        self._next_camera = 0
+
+    def add_camera(self, name, source, queue_size=4, **system_options):
+        options = dict(self.system_options, **system_options)
+        system = ParkingSecuritySystem(model=self.model, confidence=self.confidence, imgsz=self.imgsz, **options)
+        camera = CameraStream(name, source, system, queue_size=queue_size)
+        self.cameras[name] = camera
+        return camera
+
+    def start(self):
+        for camera in self.cameras.values():
+            camera.start()
+
+    def stop(self):
+        for camera in self.cameras.values():
+            camera.stop()
+
+    @property
+    def done(self):
+        return all(camera.done for camera in self.cameras.values())
+
+    #toma un frame por cámara y vuelta, empezando cada lote por una cámara distinta
+    def _collect(self):
+        cameras = list(self.cameras.values())
+        picked = []
+        while len(picked) < self.batch_size:
+            found = False
+            for k in range(len(cameras)):
+                camera = cameras[(self._next_camera + k) % len(cameras)]
+                item = camera.poll()
+                if item is None:
+                    continue
+                picked.append((camera, item))
+                found = True
+                if len(picked) == self.batch_size:
+                    break
+            if not found:
+                break
+        self._next_camera = (self._next_camera + 1) % max(len(cameras), 1)
+        return picked
+
+    #un lote de inferencia compartido; devuelve [(cámara, frame anotado, alertas)]
+    def step(self):
+        picked = self._collect()
+        if not picked:
+            return []
+
+        gaps = [camera.system.schedule_inference(frame) for camera, (frame, _) in picked]
+        #cada cámara aporta el frame entero o los tiles de sus zonas
+        inputs = [
+            camera.system.inference_inputs(frame) if gap > 0 else []
+            for (camera, (frame, _)), gap in zip(picked, gaps)
+        ]
+        images = [image for camera_inputs in inputs for image in camera_inputs]
+        predictions = []
+        if images:
+            start = time.perf_counter()
+            predictions = self.model.predict(
+                images, conf=self.confidence, iou=0.45, imgsz=self.imgsz, verbose=False
+            )
+            #el tiempo del lote se reparte por imagen entre las cámaras que lo usaron
+            share = (time.perf_counter() - start) / len(images)
+            for (camera, _), camera_inputs in zip(picked, inputs):
+                if camera_inputs:
+                    camera.system.record_inference_time(share * len(camera_inputs))
+
+        outputs = []
+        offset = 0
+        for (camera, (frame, timestamp)), gap, camera_inputs in zip(picked, gaps, inputs):
+            result = None
+            if gap > 0:
+                result = camera.system.assemble_detection(frame, predictions[offset:offset + len(camera_inputs)])
+                offset += len(camera_inputs)
+            processed_frame, alert_count = camera.system.complete_frame(frame, gap, result, timestamp)
+            camera.processed += 1
+            camera.alerts += alert_count
+            outputs.append((camera, processed_frame, alert_count))
+        return outputs
+
+    def run(self, duration=None, on_frame=None, log_interval=10.0):
+        self.start()
+        start = time.monotonic()
+        last_log = start
+        try:
+            while not self.done:
+                if duration is not None and time.monotonic() - start >= duration:
+                    break
+                outputs = self.step()
+                if not outputs:
+                    time.sleep(0.005)
+                for camera, processed_frame, alert_count in outputs:
+                    if on_frame is not None:
+                        on_frame(camera, processed_frame, alert_count)
+
+                if log_interval and time.monotonic() - last_log >= log_interval:
+                    last_log = time.monotonic()
+                    print(self.status_line())
+                    for name, camera in self.cameras.items():
+                        if camera.system.profiler.enabled:
+                            print(f"{name} {camera.system.profiler.log_line()}")
+        finally:
+            self.stop()
+
+    def metrics(self):
+        return {name: camera.metrics() for name, camera in self.cameras.items()}
+
+    def status_line(self):
+        return " | ".join(
+            f"{name}: {m['fps']:.1f} fps, cola {m['queue_depth']}, alertas {m['total_alerts']}"
+            for name, m in self.metrics().items()
+        )
+
+
+def parse_camera(spec):
+    #"nombre=fuente" o solo la fuente
+    if "=" in spec and not spec.split("=", 1)[0].count("/"):
+        name, source = spec.split("=", 1)
+        return name, source
+    return None, spec
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ParkWatch Lite - varias cámaras con un solo modelo")
+    parser.add_argument("cameras", nargs="+", help="nombre=fuente (índice, RTSP o archivo)")
+    parser.add_argument("-o", "--output-dir", default="resultados")
+    parser.add_argument("-b", "--batch-size", type=int, default=8)
+    parser.add_argument("--model", default="yolov8m.pt")
+    add_backend_arguments(parser)
+    parser.add_argument("--confidence", type=float, default=0.5)
+    parser.add_argument("--duration", type=float, default=None, help="segundos de ejecución")
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--motion-gate", choices=["mog2", "diff"], default=None,
+                        help="no inferir en frames sin movimiento")
+    parser.add_argument("--gate-threshold", type=float, default=None)
+    parser.add_argument("--profile", action="store_true", help="tiempos por etapa (p50/p95/p99) en el reporte y en consola")
+    parser.add_argument("--rotate-mb", type=float, default=None, help="rotar el registro de eventos al pasar N MB")
+    parser.add_argument("--rotate-hours", type=float, default=None, help="rotar el registro de eventos cada N horas")
+    args = parser.parse_args(argv)
+    check_backend_arguments(parser, args)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    #un solo registro para todas las cámaras; cada evento lleva su cámara
+    event_log = EventLog(
+        os.path.join(args.output_dir, "events.jsonl"),
+        max_bytes=int(args.rotate_mb * 2**20) if args.rotate_mb else None,
+        rotate_seconds=args.rotate_hours * 3600 if args.rotate_hours else None,
+    )
+    engine = MultiCameraEngine(
+        model_path=args.model,
+        backend=args.backend,
+        imgsz=args.imgsz,
+        precision=args.precision,
+        calibration_data=args.calibration_data,
+        profile=args.profile,
+        batch_size=args.batch_size,
+        confidence=args.confidence,
+        motion_gate=args.motion_gate,
+        gate_threshold=args.gate_threshold,
+        #sin salida de video no hace falta dibujar
+        annotate=False,
+    )
+    for index, spec in enumerate(args.cameras):
+        name, source = parse_camera(spec)
+        name = name or f"cam{index}"
+        engine.add_camera(name, source, queue_size=args.queue_size, event_log=event_log, camera=name)
+
+    start = time.monotonic()
+    try:
+        engine.run(duration=args.duration)
+        elapsed = time.monotonic() - start
+
+        for name, camera in engine.cameras.items():
+            stats = dict(camera.metrics(), processing_time=elapsed, source=str(camera.source),
+                         events_path=event_log.path)
+            write_report(os.path.join(args.output_dir, f"{name}_report.json"), build_report(camera.system, stats))
+    finally:
+        event_log.close()
+    print(engine.status_line())
+
+
+if __name__ == "__main__":
+    main()
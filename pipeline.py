@@ -0,0 +1,197 @@
+# pipeline.py
+import queue
+import threading
+import time
+
+from clock import VideoClock
+
+#marca de fin de video entre hilos
+_END = object()
+
+STAGES = ("decode", "inference", "encode")
+
+
+#bucle secuencial sin hilos (CLI / procesos); devuelve (frames, tiempo por etapa)
+#on_frame(indice, frame_anotado, alertas, tracks) se llama por cada frame; tracks como system.last_tracks
+#clips (clips.ClipRecorder): con system.annotate_frames=False los frames se anotan solo si van a un clip
+def run_sequential(system, cap, clock, writer=None, max_frames=None, on_frame=None, clips=None):
+    stage_times = dict.fromkeys(STAGES, 0.0)
+    frame_count = 0
+    profiler = system.profiler
+
+    while max_frames is None or frame_count < max_frames:
+        limit = system.batch_size
+        if max_frames is not None:
+            limit = min(limit, max_frames - frame_count)
+
+        t0 = time.perf_counter()
+        frames = []
+        timestamps = []
+        indices = []
+        while len(frames) < limit:
+            t = profiler.clock()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            profiler.record("decode", t)
+            frames.append(frame)
+            timestamps.append(clock.tick())
+            indices.append(clock.frame_index)
+        t1 = time.perf_counter()
+        stage_times["decode"] += t1 - t0
+        if not frames:
+            break
+
+        outputs = system.process_batch(frames, timestamps)
+        t2 = time.perf_counter()
+        stage_times["inference"] += t2 - t1
+
+        for index, video_time, (processed_frame, alert_count), tracks, overlay in zip(
+            indices, timestamps, outputs, system.batch_tracks, system.batch_overlays
+        ):
+            t = profiler.clock()
+            if on_frame is not None:
+                on_frame(index, processed_frame, alert_count, tracks)
+            elif writer is not None:
+                writer.write(processed_frame)
+            if clips is not None:
+                clips.add(processed_frame, video_time, alert_count, None if system.annotate_frames else overlay)
+            profiler.record("encode", t)
+        stage_times["encode"] += time.perf_counter() - t2
+
+        frame_count += len(frames)
+
+    return frame_count, stage_times
+
+
+class FramePipeline:
+    #lectura -> inferencia -> escritura, cada etapa en su hilo con colas acotadas
+    #la escritura va al video completo (`writer`) y/o a clips por alerta (`clips`)
+
+    def __init__(self, cap, system, writer=None, queue_size=8, clips=None):
+        self.cap = cap
+        self.system = system
+        self.writer = writer
+        self.clips = clips
+        self.clock = VideoClock(cap)
+
+        self.read_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+
+        self.frame_count = 0
+        self.error = None
+
+        self._latest = None
+        self._latest_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        stages = [("reader", self._read_loop), ("inference", self._infer_loop)]
+        if self.writer is not None or self.clips is not None:
+            stages.append(("writer", self._write_loop))
+
+        for name, target in stages:
+            thread = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    @property
+    def done(self):
+        return not any(thread.is_alive() for thread in self._threads)
+
+    #ultimo frame anotado (frame, alertas, indice, overlay); None si no hay uno nuevo
+    #con system.annotate_frames=False el frame va sin dibujar y overlay es lo necesario para anotarlo
+    def latest(self):
+        with self._latest_lock:
+            item = self._latest
+            self._latest = None
+        return item
+
+    #colas que no bloquean para siempre si se detiene el pipeline
+    def _put(self, q, item):
+        while not self._stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _fail(self, exc):
+        if self.error is None:
+            self.error = exc
+        self._stop_event.set()
+
+    def _read_loop(self):
+        try:
+            profiler = self.system.profiler
+            while not self._stop_event.is_set():
+                t = profiler.clock()
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                profiler.record("decode", t)
+                if not self._put(self.read_queue, (frame, self.clock.tick())):
+                    return
+        except Exception as exc:
+            self._fail(exc)
+        finally:
+            self._put(self.read_queue, _END)
+
+    def _infer_loop(self):
+        try:
+            while True:
+                item = self._get(self.read_queue)
+                if item is _END:
+                    break
+
+                frame, video_time = item
+                processed_frame, alert_count = self.system.process_frame(frame, video_time)
+                overlay = None if self.system.annotate_frames else self.system.last_overlay
+                self.frame_count += 1
+
+                with self._latest_lock:
+                    self._latest = (processed_frame, alert_count, self.frame_count, overlay)
+
+                if self.writer is not None or self.clips is not None:
+                    if not self._put(self.write_queue, (processed_frame, video_time, alert_count, overlay)):
+                        return
+        except Exception as exc:
+            self._fail(exc)
+        finally:
+            if self.writer is not None or self.clips is not None:
+                self._put(self.write_queue, _END)
+
+    def _write_loop(self):
+        try:
+            profiler = self.system.profiler
+            while True:
+                item = self._get(self.write_queue)
+                if item is _END:
+                    break
+                frame, video_time, alert_count, overlay = item
+                t = profiler.clock()
+                if self.writer is not None:
+                    self.writer.write(frame)
+                if self.clips is not None:
+                    self.clips.add(frame, video_time, alert_count, overlay)
+                profiler.record("encode", t)
+        except Exception as exc:
+            self._fail(exc)
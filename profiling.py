@@ -0,0 +1,97 @@
+# profiling.py
+import threading
+import time
+
+import numpy as np
+
+#límites (ms) de los cubos del histograma
+HISTOGRAM_EDGES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class StageProfiler:
+    #tiempos por etapa: totales acumulados y las últimas `window` muestras para percentiles
+    #desactivado, clock() y record() solo comprueban `enabled`
+
+    def __init__(self, enabled=False, window=4096, log_interval=None):
+        self.enabled = enabled
+        self.window = window
+        self.log_interval = log_interval
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._last_log = time.monotonic()
+
+    def clock(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    #registra el tiempo desde `start` y devuelve el instante actual (para encadenar etapas)
+    def record(self, stage, start):
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        self.add(stage, now - start)
+        return now
+
+    def add(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = {
+                    "samples": np.zeros(self.window, dtype=np.float64),
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                }
+            entry["samples"][entry["count"] % self.window] = seconds
+            entry["count"] += 1
+            entry["total"] += seconds
+            if seconds > entry["max"]:
+                entry["max"] = seconds
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+
+    #por etapa: llamadas, total, media y p50/p95/p99 (ms) de la ventana reciente, con histograma
+    def summary(self):
+        with self._lock:
+            entries = {
+                stage: (entry["samples"][:min(entry["count"], self.window)].copy(),
+                        entry["count"], entry["total"], entry["max"])
+                for stage, entry in self.stages.items()
+            }
+
+        summary = {}
+        for stage, (samples, count, total, maximum) in entries.items():
+            ms = samples * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            buckets = np.bincount(np.searchsorted(HISTOGRAM_EDGES_MS, ms), minlength=len(HISTOGRAM_EDGES_MS) + 1)
+            labels = [f"<{edge}" for edge in HISTOGRAM_EDGES_MS] + [f">={HISTOGRAM_EDGES_MS[-1]}"]
+            summary[stage] = {
+                "count": count,
+                "total_s": total,
+                "mean_ms": total / count * 1000,
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": maximum * 1000,
+                "histogram_ms": dict(zip(labels, buckets.tolist())),
+            }
+        return summary
+
+    def log_line(self):
+        parts = [
+            f"{stage} {s['p50_ms']:.1f}/{s['p95_ms']:.1f}/{s['p99_ms']:.1f}"
+            for stage, s in sorted(self.summary().items(), key=lambda item: -item[1]["total_s"])
+        ]
+        return "[perfil ms p50/p95/p99] " + " | ".join(parts)
+
+    #imprime log_line cada `log_interval` segundos
+    def maybe_log(self):
+        if not self.enabled or not self.log_interval:
+            return
+        now = time.monotonic()
+        if now - self._last_log >= self.log_interval:
+            self._last_log = now
+            print(self.log_line(), flush=True)
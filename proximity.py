@@ -0,0 +1,165 @@
+# proximity.py
+from collections import defaultdict
+
+import numpy as np
+
+#margen (px) con el que se expande la caja del vehículo
+VEHICLE_MARGIN = 40
+#umbrales de cercanía persona-vehículo
+IOU_MIN = 0.02
+PROXIMITY_MIN = 0.1
+
+
+#en float64, igual que paired_iou, para que los umbrales decidan lo mismo en los dos caminos
+def bbox_iou(boxA, boxB):
+    boxA = [float(v) for v in boxA[:4]]
+    boxB = [float(v) for v in boxB[:4]]
+    xA = max(boxA[0], boxB[0])
+    yA = max(boxA[1], boxB[1])
+    xB = min(boxA[2], boxB[2])
+    yB = min(boxA[3], boxB[3])
+
+    interArea = max(0, xB - xA) * max(0, yB - yA)
+    boxAArea = (boxA[2] - boxA[0]) * (boxA[3] - boxA[1])
+    boxBArea = (boxB[2] - boxB[0]) * (boxB[3] - boxB[1])
+
+    if boxAArea == 0 or boxBArea == 0:
+        return 0
+    return interArea / (boxAArea + boxBArea - interArea)
+
+
+def expand_boxes(boxes, margin=VEHICLE_MARGIN):
+    # en el mismo dtype que las cajas, igual que vx1 - 40 con escalares
+    expanded = np.array(boxes, copy=True)
+    expanded[..., :2] -= margin
+    expanded[..., 2:] += margin
+    return expanded
+
+
+#IoU elemento a elemento; las formas (..., 4) se combinan por broadcasting
+def paired_iou(boxes_a, boxes_b):
+    boxes_a = np.asarray(boxes_a, dtype=np.float64)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64)
+    xA = np.maximum(boxes_a[..., 0], boxes_b[..., 0])
+    yA = np.maximum(boxes_a[..., 1], boxes_b[..., 1])
+    xB = np.minimum(boxes_a[..., 2], boxes_b[..., 2])
+    yB = np.minimum(boxes_a[..., 3], boxes_b[..., 3])
+
+    inter = np.maximum(0, xB - xA) * np.maximum(0, yB - yA)
+    areaA = (boxes_a[..., 2] - boxes_a[..., 0]) * (boxes_a[..., 3] - boxes_a[..., 1])
+    areaB = (boxes_b[..., 2] - boxes_b[..., 0]) * (boxes_b[..., 3] - boxes_b[..., 1])
+
+    union = areaA + areaB - inter
+    valid = (areaA != 0) & (areaB != 0)
+
+    iou = np.zeros_like(union)
+    np.divide(inter, union, out=iou, where=valid)
+    return iou
+
+
+#IoU de todas las parejas (N x M) en una sola operación
+def iou_matrix(boxes_a, boxes_b):
+    return paired_iou(boxes_a[:, None, :], boxes_b[None, :, :])
+
+
+#cercanía elemento a elemento (IoU real o IoU con la caja expandida)
+def paired_close(person_boxes, vehicle_boxes, margin=VEHICLE_MARGIN):
+    iou = paired_iou(person_boxes, vehicle_boxes)
+    proximity = paired_iou(person_boxes, expand_boxes(vehicle_boxes, margin))
+    close = (iou > IOU_MIN) | (proximity > PROXIMITY_MIN)
+    return close, iou
+
+
+#matriz de parejas cercanas (N x M)
+def close_pairs(person_boxes, vehicle_boxes, margin=VEHICLE_MARGIN):
+    return paired_close(person_boxes[:, None, :], vehicle_boxes[None, :, :], margin)
+
+
+class VehicleGrid:
+    #rejilla uniforme con las cajas expandidas de los vehículos, actualizada por track
+
+    def __init__(self, cell_size=128, margin=VEHICLE_MARGIN):
+        self.cell_size = cell_size
+        self.margin = margin
+        self.cells = defaultdict(set)
+        self.entries = {}
+        #fila de cada vehículo en la última lista recibida
+        self.rows = {}
+        self._ids = None
+        self._ranges = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    #rangos de celdas (cx1, cy1, cx2, cy2) de todas las cajas en una operación
+    def _cell_ranges(self, boxes, margin):
+        lo = np.floor_divide(boxes[:, :2] - margin, self.cell_size)
+        hi = np.floor_divide(boxes[:, 2:] + margin, self.cell_size)
+        return np.hstack([lo, hi]).astype(np.int64)
+
+    def _cells(self, cell_range):
+        cx1, cy1, cx2, cy2 = cell_range
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                yield cx, cy
+
+    def _insert(self, vehicle_id, cell_range):
+        for cell in self._cells(cell_range):
+            self.cells[cell].add(vehicle_id)
+        self.entries[vehicle_id] = cell_range
+
+    def _remove(self, vehicle_id):
+        for cell in self._cells(self.entries.pop(vehicle_id)):
+            ids = self.cells[cell]
+            ids.discard(vehicle_id)
+            if not ids:
+                del self.cells[cell]
+
+    def _move(self, vehicle_id, cell_range):
+        if self.entries.get(vehicle_id) == cell_range:
+            return
+        if vehicle_id in self.entries:
+            self._remove(vehicle_id)
+        self._insert(vehicle_id, cell_range)
+
+    #solo se tocan las celdas de los tracks que cambiaron de celda o desaparecieron
+    def update(self, vehicle_ids, vehicle_boxes):
+        ids = np.asarray(vehicle_ids, dtype=np.int64)
+        ranges = (
+            self._cell_ranges(vehicle_boxes, self.margin)
+            if len(ids) else np.empty((0, 4), dtype=np.int64)
+        )
+
+        if self._ids is not None and np.array_equal(ids, self._ids):
+            #mismos tracks en el mismo orden (lo normal con autos estacionados)
+            for row in np.nonzero((ranges != self._ranges).any(axis=1))[0]:
+                self._move(int(ids[row]), tuple(ranges[row].tolist()))
+        else:
+            seen = set(vehicle_ids)
+            for vehicle_id in [v for v in self.entries if v not in seen]:
+                self._remove(vehicle_id)
+            for vehicle_id, cell_range in zip(vehicle_ids, ranges.tolist()):
+                self._move(vehicle_id, tuple(cell_range))
+            self.rows = {vehicle_id: row for row, vehicle_id in enumerate(vehicle_ids)}
+
+        self._ids = ids
+        self._ranges = ranges
+
+    #por cada caja, filas de los vehículos cuya caja expandida puede cruzarse con ella
+    def query(self, boxes):
+        found = []
+        for cell_range in self._cell_ranges(boxes, 0).tolist():
+            ids = set()
+            for cell in self._cells(cell_range):
+                bucket = self.cells.get(cell)
+                if bucket:
+                    ids |= bucket
+            found.append(sorted(self.rows[v] for v in ids))
+        return found
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.rows = {}
+        self._ids = None
+        self._ranges = None
@@ -0,0 +1,57 @@
+# report.py
+import json
+import time
+
+
+def system_configuration(system):
+    configuration = {
+        "confidence_threshold": system.confidence if system else 0.5,
+        "proximity_threshold": system.proximity_threshold if system else 100,
+        "loitering_time_threshold": system.loitering_time_threshold if system else 5,
+    }
+    if system is not None and system.roi is not None:
+        configuration["roi"] = {
+            "zones": [zone.tolist() for zone in system.roi.zones],
+            "tile_size": system.roi.tile_size,
+            "tiles": system.roi.tile_count,
+        }
+    return configuration
+
+
+#reporte JSON con estadisticas, configuracion y eventos del sistema
+#(events/configuration permiten armarlo sin un sistema, p. ej. al unir chunks)
+def build_report(system, stats, events=None, configuration=None):
+    if system is not None:
+        stats = dict(
+            stats,
+            adaptive_stride=system.stride_statistics(stats.get("processing_time")),
+            state=system.state_metrics(),
+        )
+        if system.motion_gate is not None:
+            stats["motion_gate"] = system.gate_statistics()
+        if system.profiler.enabled:
+            stats["profile"] = system.profiler.summary()
+        if system.history is not None:
+            stats["dwell"] = system.history.summary()
+    buffer = system.suspicious_events if system else None
+    log = buffer.log if buffer is not None else None
+    if events is None:
+        #con registro en disco los últimos eventos salen del registro, no de la memoria
+        events = log.recent if log is not None and buffer.owns_log else (buffer or [])
+
+    report = {
+        "execution_date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "statistics": stats,
+        "configuration": configuration or system_configuration(system),
+        "suspicious_events": list(events)[-10:],
+    }
+    if log is not None:
+        #resumen incremental de todos los eventos (el detalle está en el registro y su índice)
+        log.flush()
+        report["event_log"] = log.summary()
+    return report
+
+
+def write_report(path, report):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
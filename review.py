@@ -0,0 +1,211 @@
+# review.py
+# Reproductor del video procesado: índice de frames escrito junto al video, caché LRU de frames
+# ya redimensionados y decodificación/prefetch en un hilo alrededor de la posición del slider.
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from events import EventLogReader
+
+#OpenCV (FFmpeg) escribe mp4v con un frame clave cada 12 frames (gop_size del codificador)
+KEYFRAME_INTERVAL = 12
+#un seek cuesta lo que decodificar ~20 frames; más cerca que esto se decodifica hacia adelante
+SEEK_DISTANCE = 2 * KEYFRAME_INTERVAL
+
+
+def frame_index_path(video_path):
+    return os.path.splitext(video_path)[0] + ".frames.npz"
+
+
+class IndexedVideoWriter:
+    #cv2.VideoWriter que además guarda el tiempo de video de cada frame escrito (índice para el reproductor)
+
+    def __init__(self, path, fourcc, fps, size, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.fps = fps
+        self.keyframe_interval = keyframe_interval
+        self.writer = cv2.VideoWriter(path, fourcc, fps, size)
+        self.times = []
+
+    def isOpened(self):
+        return self.writer.isOpened()
+
+    def write(self, frame, video_time=None):
+        self.writer.write(frame)
+        self.times.append(len(self.times) / self.fps if video_time is None else video_time)
+
+    def release(self):
+        if self.writer is None:
+            return
+        self.writer.release()
+        self.writer = None
+        np.savez(
+            frame_index_path(self.path),
+            times=np.asarray(self.times, dtype=np.float64),
+            fps=self.fps,
+            keyframe_interval=self.keyframe_interval,
+        )
+
+
+class FrameIndex:
+    #tiempo de video de cada frame y posición de los frames clave
+
+    def __init__(self, times, fps, keyframe_interval=KEYFRAME_INTERVAL):
+        self.times = np.asarray(times, dtype=np.float64)
+        self.fps = fps
+        self.keyframe_interval = keyframe_interval
+
+    def __len__(self):
+        return len(self.times)
+
+    #frame clave desde el que se decodifica `frame_index`
+    def keyframe(self, frame_index):
+        return frame_index - frame_index % self.keyframe_interval
+
+    #primer frame con tiempo >= video_time (acepta arrays)
+    def frame_at(self, video_time):
+        frames = np.searchsorted(self.times, video_time)
+        return np.clip(frames, 0, max(len(self.times) - 1, 0))
+
+
+#índice guardado por IndexedVideoWriter; sin él, se estima con los metadatos del contenedor
+def load_frame_index(video_path, cap=None):
+    path = frame_index_path(video_path)
+    if os.path.exists(path):
+        data = np.load(path)
+        return FrameIndex(data["times"], float(data["fps"]), int(data["keyframe_interval"]))
+
+    release = cap is None
+    cap = cap or cv2.VideoCapture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        if release:
+            cap.release()
+    return FrameIndex(np.arange(max(n_frames, 0)) / fps, fps)
+
+
+#frames (ordenados, sin repetir) en los que empieza cada alerta del registro de eventos
+def alert_frames(events_path, index):
+    if not events_path or not len(index):
+        return np.zeros(0, dtype=np.int64)
+    times = EventLogReader(events_path).index["video_time"]
+    times = times[~np.isnan(times)]
+    return np.unique(index.frame_at(times))
+
+
+class ReviewReader:
+    #decodifica en un hilo propio; la UI pide un frame con request() y lo toma de la caché con get()
+    #alrededor del último frame pedido se decodifican `prefetch` frames hacia adelante y hacia atrás
+
+    def __init__(self, video_path, size, cache_mb=256, prefetch=SEEK_DISTANCE):
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise IOError(f"No se pudo abrir el video: {video_path}")
+        self.index = load_frame_index(video_path, self.cap)
+
+        #tamaño en pantalla: solo se reduce, manteniendo la proporción
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or size[0]
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or size[1]
+        scale = min(size[0] / width, size[1] / height, 1.0)
+        self.size = (max(int(width * scale), 1), max(int(height * scale), 1))
+
+        self.cache_frames = max(int(cache_mb * 2**20 // (self.size[0] * self.size[1] * 3)), 2 * prefetch + 1)
+        self.prefetch = prefetch
+        self.cache = OrderedDict()
+
+        #próximo frame que devuelve cap.read() (solo lo toca el hilo)
+        self._position = 0
+        self._target = None
+        self._closed = False
+        self._wake = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="review-decoder", daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self.index)
+
+    #frame RGB ya redimensionado, o None si todavía no está decodificado
+    def get(self, frame_index):
+        with self._wake:
+            frame = self.cache.get(frame_index)
+            if frame is not None:
+                self.cache.move_to_end(frame_index)
+            return frame
+
+    #el pedido más reciente reemplaza al anterior (al arrastrar el slider solo importa el último)
+    def request(self, frame_index):
+        with self._wake:
+            self._target = frame_index
+            self._wake.notify()
+
+    def close(self):
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+        self._thread.join()
+        self.cap.release()
+
+    def _run(self):
+        plan = []
+        while True:
+            with self._wake:
+                while not self._closed and self._target is None and not plan:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                if self._target is not None:
+                    target = self._target
+                    self._target = None
+                    plan = [target] + self._around(target)
+
+            frame_index = plan.pop(0)
+            with self._wake:
+                cached = frame_index in self.cache
+            if not cached:
+                self._decode(frame_index)
+
+    #primero hacia adelante (reproducción), después el tramo anterior (arrastre hacia atrás)
+    def _around(self, frame_index):
+        n = len(self.index)
+        forward = range(frame_index + 1, min(frame_index + 1 + self.prefetch, n))
+        backward = range(max(frame_index - self.prefetch, 0), frame_index)
+        return list(forward) + list(backward)
+
+    #decodifica hasta `frame_index` guardando en caché todo lo que pasa por el decodificador
+    def _decode(self, frame_index):
+        if not 0 <= frame_index < len(self.index):
+            return
+        if frame_index < self._position or frame_index - self._position > SEEK_DISTANCE:
+            self._position = self.index.keyframe(frame_index)
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self._position)
+
+        while self._position <= frame_index:
+            with self._wake:
+                cached = self._position in self.cache
+            #lo que ya está en caché solo se avanza (grab no convierte el frame)
+            if cached:
+                ok = self.cap.grab()
+            else:
+                ok, frame = self.cap.read()
+                if ok:
+                    self._store(self._position, frame)
+            if not ok:
+                #el contenedor tiene menos frames de los indicados; se fuerza un seek la próxima vez
+                self._position = len(self.index)
+                return
+            self._position += 1
+
+    def _store(self, frame_index, frame):
+        if frame.shape[1::-1] != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with self._wake:
+            self.cache[frame_index] = frame
+            self.cache.move_to_end(frame_index)
+            while len(self.cache) > self.cache_frames:
+                self.cache.popitem(last=False)
@@ -0,0 +1,190 @@
+# roi.py
+# Zonas de estacionamiento (polígonos): la inferencia se hace solo sobre recortes/tiles que las cubren.
+import json
+import math
+
+import cv2
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+
+def load_zones(path):
+    #JSON: lista de polígonos [[x, y], ...] en pixeles o normalizados (0-1)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _axis_starts(start, end, tile, overlap):
+    length = end - start
+    if length <= tile:
+        return [start]
+    n = math.ceil((length - overlap) / (tile - overlap))
+    return [int(round(v)) for v in np.linspace(start, end - tile, n)]
+
+
+def _overlap(box, boxes):
+    #(intersección / área de la más chica, IoU, la de `boxes` es la más chica)
+    xA = np.maximum(box[0], boxes[:, 0])
+    yA = np.maximum(box[1], boxes[:, 1])
+    xB = np.minimum(box[2], boxes[:, 2])
+    yB = np.minimum(box[3], boxes[:, 3])
+    inter = np.maximum(0, xB - xA) * np.maximum(0, yB - yA)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    smaller = np.minimum(area, areas)
+    union = area + areas - inter
+    ios = np.divide(inter, smaller, out=np.zeros_like(inter), where=smaller > 0)
+    iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+    return ios, iou, areas <= area
+
+
+#cajas que tocan un borde del tile que no es borde del frame: el recorte las cortó
+def cut_by_tile(boxes, tile, shape, margin=2):
+    x0, y0, x1, y1 = tile
+    height, width = shape[:2]
+    return (
+        ((x0 > 0) & (boxes[:, 0] <= x0 + margin))
+        | ((y0 > 0) & (boxes[:, 1] <= y0 + margin))
+        | ((x1 < width) & (boxes[:, 2] >= x1 - margin))
+        | ((y1 < height) & (boxes[:, 3] >= y1 - margin))
+    )
+
+
+#fusión de duplicados de costura, por clase: solo se unen cajas de tiles distintos (dos cajas de tiles
+#distintos que se cruzan lo hacen dentro de la banda que comparten); dentro de un tile queda la salida
+#del NMS del detector tal cual (un niño delante de un adulto, autos pegados o tapados siguen separados)
+#se unen la misma caja vista entera por dos tiles (IoU > duplicate_iou) y la parte cortada por el borde
+#de un tile con la caja que la contiene (la más chica debe ser la cortada: un niño entero delante de un
+#adulto cortado no se une)
+def merge_detections(data, tiles, cut, match_threshold=0.6, duplicate_iou=0.7):
+    if len(data) <= 1:
+        return data
+
+    merged = []
+    for cls in np.unique(data[:, 5]):
+        in_class = data[:, 5] == cls
+        order = np.argsort(-data[in_class, 4], kind="stable")
+        rows = data[in_class][order]
+        row_tiles = tiles[in_class][order]
+        row_cut = cut[in_class][order]
+        while len(rows):
+            best = rows[0].copy()
+            best_cut = row_cut[0]
+            used_tiles = {row_tiles[0]}
+            keep = np.ones(len(rows) - 1, dtype=bool)
+            rest, rest_tiles, rest_cut = rows[1:], row_tiles[1:], row_cut[1:]
+
+            #la caja crece con cada unión, así que se vuelve a comparar hasta que no absorba más
+            while keep.any():
+                ios, iou, rest_smaller = _overlap(best, rest)
+                cut_smaller = np.where(rest_smaller, rest_cut, best_cut)
+                match = (
+                    keep
+                    & ~np.isin(rest_tiles, list(used_tiles))
+                    & ((iou > duplicate_iou) | ((ios > match_threshold) & cut_smaller))
+                )
+                if not match.any():
+                    break
+                group = rest[match]
+                best[:2] = np.minimum(best[:2], group[:, :2].min(axis=0))
+                best[2:4] = np.maximum(best[2:4], group[:, 2:4].max(axis=0))
+                #la unión ya no es una parte cortada
+                best_cut = False
+                used_tiles.update(rest_tiles[match].tolist())
+                keep &= ~match
+
+            merged.append(best)
+            rows, row_tiles, row_cut = rest[keep], rest_tiles[keep], rest_cut[keep]
+
+    return np.stack(merged)
+
+
+class RegionTiler:
+    #recortes de `tile_size` px con `overlap` px de solapamiento sobre el rectángulo de cada zona
+
+    def __init__(self, zones, tile_size=640, overlap=64, match_threshold=0.6):
+        self.zones = [np.asarray(zone, dtype=np.float64) for zone in zones]
+        self.tile_size = int(tile_size)
+        self.overlap = min(int(overlap), self.tile_size // 2)
+        self.match_threshold = match_threshold
+        self._shape = None
+        self._tiles = []
+        self._polygons = []
+
+    #tiles de la última resolución vista
+    @property
+    def tile_count(self):
+        return len(self._tiles)
+
+    #zonas en pixeles para un tamaño de frame (se calcula una vez por resolución)
+    def polygons(self, shape):
+        self._plan(shape)
+        return self._polygons
+
+    def tiles(self, shape):
+        self._plan(shape)
+        return self._tiles
+
+    def _plan(self, shape):
+        height, width = shape[:2]
+        if self._shape == (height, width):
+            return
+        self._shape = (height, width)
+
+        self._polygons = []
+        for zone in self.zones:
+            points = zone * (width, height) if zone.max() <= 1.0 else zone
+            self._polygons.append(points.round().astype(np.int32))
+
+        tiles = []
+        for points in self._polygons:
+            x0, y0 = np.clip(points.min(axis=0), 0, None)
+            x1 = min(int(points[:, 0].max()) + 1, width)
+            y1 = min(int(points[:, 1].max()) + 1, height)
+
+            #una zona más chica que el tile se agranda hasta el tile (más contexto, mismo costo)
+            tile_w = min(self.tile_size, width)
+            tile_h = min(self.tile_size, height)
+            if x1 - x0 < tile_w:
+                x0 = max(min(int(x0) - (tile_w - (x1 - x0)) // 2, width - tile_w), 0)
+                x1 = x0 + tile_w
+            if y1 - y0 < tile_h:
+                y0 = max(min(int(y0) - (tile_h - (y1 - y0)) // 2, height - tile_h), 0)
+                y1 = y0 + tile_h
+
+            for ty in _axis_starts(int(y0), y1, tile_h, self.overlap):
+                for tx in _axis_starts(int(x0), x1, tile_w, self.overlap):
+                    tile = (tx, ty, tx + tile_w, ty + tile_h)
+                    if tile not in tiles:
+                        tiles.append(tile)
+        self._tiles = tiles
+
+    def crops(self, frame):
+        return [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in self.tiles(frame.shape)]
+
+    #detecciones de los tiles en coordenadas del frame, unidas en las costuras
+    def assemble(self, frame, results):
+        data = []
+        tiles = []
+        cut = []
+        for index, (tile, result) in enumerate(zip(self.tiles(frame.shape), results)):
+            boxes = result.boxes.data.cpu().numpy().copy()
+            if len(boxes):
+                boxes[:, [0, 2]] += tile[0]
+                boxes[:, [1, 3]] += tile[1]
+                data.append(boxes[:, :6])
+                tiles.append(np.full(len(boxes), index))
+                cut.append(cut_by_tile(boxes, tile, frame.shape))
+
+        if data:
+            data = merge_detections(
+                np.concatenate(data).astype(np.float32), np.concatenate(tiles), np.concatenate(cut),
+                self.match_threshold,
+            )
+        else:
+            data = np.zeros((0, 6), dtype=np.float32)
+        return Results(frame, results[0].path, results[0].names, boxes=torch.as_tensor(data))
+
+    def draw(self, frame):
+        cv2.polylines(frame, self.polygons(frame.shape), True, (255, 128, 0), 1)
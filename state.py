@@ -0,0 +1,165 @@
+# state.py
+import threading
+from collections import OrderedDict, defaultdict, deque
+
+from events import EventLog
+
+
+class PairStateStore:
+    #estado persona-vehículo acotado: expira con los tracks y tiene un tope de parejas y de tracks
+    #(max_tracks por tipo, max_pairs si no se indica)
+
+    def __init__(self, track_ttl=30.0, max_pairs=10000, max_tracks=None):
+        self.track_ttl = track_ttl
+        self.max_pairs = max_pairs
+        self.max_tracks = max_tracks or max_pairs
+
+        #(persona, vehiculo) -> tiempo desde el que están cerca (orden = antigüedad)
+        self.first_seen = {}
+        self.alerted = set()
+
+        #último tiempo en que se vio cada track, del más viejo al más reciente
+        self.person_seen = OrderedDict()
+        self.vehicle_seen = OrderedDict()
+        self._by_person = defaultdict(set)
+        self._by_vehicle = defaultdict(set)
+
+        self.expired_pairs = 0
+        self.evicted_pairs = 0
+        self.evicted_tracks = 0
+
+    def __contains__(self, key):
+        return key in self.first_seen
+
+    def __len__(self):
+        return len(self.first_seen)
+
+    def since(self, key):
+        return self.first_seen[key]
+
+    def start(self, key, current_time):
+        if key in self.first_seen:
+            return
+        while len(self.first_seen) >= self.max_pairs:
+            self.release(next(iter(self.first_seen)))
+            self.evicted_pairs += 1
+
+        person_id, vehicle_id = key
+        self.first_seen[key] = current_time
+        self._by_person[person_id].add(vehicle_id)
+        self._by_vehicle[vehicle_id].add(person_id)
+
+    def release(self, key):
+        if self.first_seen.pop(key, None) is None:
+            return
+        self.alerted.discard(key)
+
+        person_id, vehicle_id = key
+        self._discard(self._by_person, person_id, vehicle_id)
+        self._discard(self._by_vehicle, vehicle_id, person_id)
+
+    def _discard(self, index, track_id, other_id):
+        others = index.get(track_id)
+        if others is not None:
+            others.discard(other_id)
+            if not others:
+                del index[track_id]
+
+    def _tables(self):
+        return (
+            (self.person_seen, self._by_person, True),
+            (self.vehicle_seen, self._by_vehicle, False),
+        )
+
+    #saca el track visto hace más tiempo y sus parejas; devuelve cuántas parejas soltó
+    def _drop_oldest(self, seen, index, is_person):
+        track_id, _ = seen.popitem(last=False)
+        others = list(index.get(track_id, ()))
+        for other_id in others:
+            self.release((track_id, other_id) if is_person else (other_id, track_id))
+        return len(others)
+
+    #con muchos ids nuevos dentro de track_ttl (p. ej. cambios de id del tracker) se descartan los más viejos
+    def touch(self, person_ids, vehicle_ids, current_time):
+        for (seen, index, is_person), ids in zip(self._tables(), (person_ids, vehicle_ids)):
+            for track_id in ids:
+                seen[track_id] = current_time
+                seen.move_to_end(track_id)
+            while len(seen) > self.max_tracks:
+                self.evicted_pairs += self._drop_oldest(seen, index, is_person)
+                self.evicted_tracks += 1
+
+    #borra los tracks que no aparecen desde hace más de track_ttl, con sus parejas
+    def expire(self, current_time):
+        limit = current_time - self.track_ttl
+        for seen, index, is_person in self._tables():
+            while seen and next(iter(seen.values())) < limit:
+                self.expired_pairs += self._drop_oldest(seen, index, is_person)
+
+    def clear(self):
+        self.first_seen.clear()
+        self.alerted.clear()
+        self.person_seen.clear()
+        self.vehicle_seen.clear()
+        self._by_person.clear()
+        self._by_vehicle.clear()
+        self.expired_pairs = 0
+        self.evicted_pairs = 0
+        self.evicted_tracks = 0
+
+    def metrics(self):
+        return {
+            "pairs": len(self.first_seen),
+            "alerted_pairs": len(self.alerted),
+            "tracked_persons": len(self.person_seen),
+            "tracked_vehicles": len(self.vehicle_seen),
+            "expired_pairs": self.expired_pairs,
+            "evicted_pairs": self.evicted_pairs,
+            "evicted_tracks": self.evicted_tracks,
+        }
+
+
+class EventBuffer(deque):
+    #últimos eventos en memoria; con `path` (o un `log` compartido) todos quedan en el registro en disco
+    #el hilo de inferencia agrega y la interfaz lee: recent()/since() copian bajo el mismo lock que append
+
+    def __init__(self, path=None, maxlen=1000, log=None, camera=None):
+        super().__init__(maxlen=maxlen)
+        self.log = log if log is not None else (EventLog(path) if path else None)
+        self.owns_log = log is None
+        self.camera = camera
+        self.total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.log.path if self.log is not None else None
+
+    def append(self, event):
+        if self.camera is not None:
+            event = dict(event, camera=self.camera)
+        with self._lock:
+            super().append(event)
+            self.total += 1
+        if self.log is not None:
+            self.log.append(event, camera=self.camera)
+
+    def recent(self, n):
+        with self._lock:
+            n = min(n, len(self))
+            return list(self)[len(self) - n:]
+
+    #(eventos agregados desde que el total era `total`, total actual) leídos juntos; los que ya
+    #salieron del búfer (más de maxlen desde la última lectura) no se devuelven
+    def since(self, total):
+        with self._lock:
+            n = min(self.total - total, len(self))
+            return list(self)[len(self) - n:] if n > 0 else [], self.total
+
+    def maybe_flush(self):
+        if self.log is not None:
+            self.log.maybe_flush()
+
+    def close(self):
+        if self.log is not None and self.owns_log:
+            self.log.close()